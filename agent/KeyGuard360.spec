@@ -1,4 +1,8 @@
 # -*- mode: python ; coding: utf-8 -*-
+# Built as a one-folder app for fast cold start: a one-file exe unpacks
+# everything to a temp dir on every launch. Build with:
+#   pyinstaller KeyGuard360.spec   ->   dist/KeyGuard360/KeyGuard360.exe
+# Check import time with: python benchmark_startup.py --target app
 
 
 a = Analysis(
@@ -6,11 +10,30 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    # Platform backends loaded dynamically by pynput/pystray (the agent
+    # imports both lazily, so the analysis cannot always see them)
+    hiddenimports=[
+        'pynput.keyboard._win32',
+        'pynput.keyboard._darwin',
+        'pynput.keyboard._xorg',
+        'pystray._win32',
+        'pystray._darwin',
+        'pystray._xorg',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    # Large packages that get pulled in if installed but are never used
+    excludes=[
+        'numpy',
+        'pandas',
+        'matplotlib',
+        'scipy',
+        'IPython',
+        'pytest',
+        'setuptools',
+        'pydoc_data',
+    ],
     noarchive=False,
     optimize=0,
 )
@@ -19,16 +42,15 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='KeyGuard360',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    # UPX-packed DLLs have to be decompressed at load time (and are slow to
+    # pass antivirus scanning), which costs more startup than it saves
+    upx=False,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -37,3 +59,12 @@ exe = EXE(
     entitlements_file=None,
     icon='NONE',
 )
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='KeyGuard360',
+)
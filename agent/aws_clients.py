@@ -0,0 +1,86 @@
+"""
+KeyGuard360 AWS Client Factory
+One shared boto3 session per process with a tuned botocore Config
+(connection pool, TCP keep-alive, timeouts, retry mode). Clients and
+resources are created on first use and then reused, so nothing is built
+for services a run never touches and connections stay warm between calls.
+boto3 itself is only imported when the first client is requested.
+"""
+
+import threading
+
+
+class AwsClientFactory:
+    """Lazily created, cached boto3 clients/resources sharing one session"""
+
+    def __init__(self, config, retry_mode='standard', max_attempts=3):
+        """
+        config:       KeyGuard360 Config (credentials, region, connection settings)
+        retry_mode /
+        max_attempts: botocore retry settings; the agent passes max_attempts=1
+                      because its own rate limiter handles retries
+        """
+        self.config = config
+        self.retries = {'mode': retry_mode, 'max_attempts': max_attempts}
+        self.boto_config = None
+        self._session = None
+        self._clients = {}
+        self._resources = {}
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        # boto3 sessions are not thread-safe to create clients from concurrently,
+        # so callers go through the lock below
+        if self._session is None:
+            import boto3
+            from botocore.config import Config as BotoConfig
+
+            self.boto_config = BotoConfig(
+                region_name=self.config.AWS_REGION,
+                max_pool_connections=self.config.AWS_MAX_POOL_CONNECTIONS,
+                connect_timeout=self.config.AWS_CONNECT_TIMEOUT,
+                read_timeout=self.config.AWS_READ_TIMEOUT,
+                tcp_keepalive=True,
+                retries=self.retries
+            )
+            self._session = boto3.session.Session(
+                aws_access_key_id=self.config.AWS_ACCESS_KEY,
+                aws_secret_access_key=self.config.AWS_SECRET_KEY,
+                region_name=self.config.AWS_REGION
+            )
+        return self._session
+
+    def client(self, service: str):
+        """Shared low-level client for a service (created on first call)"""
+        client = self._clients.get(service)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(service)
+                if client is None:
+                    client = self.session.client(service, config=self.boto_config)
+                    self._clients[service] = client
+        return client
+
+    def resource(self, service: str):
+        """Shared service resource (created on first call)"""
+        resource = self._resources.get(service)
+        if resource is None:
+            with self._lock:
+                resource = self._resources.get(service)
+                if resource is None:
+                    resource = self.session.resource(service, config=self.boto_config)
+                    self._resources[service] = resource
+        return resource
+
+    def table(self, name: str):
+        """DynamoDB Table object on the shared resource"""
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables[name] = self.resource('dynamodb').Table(name)
+        return table
+
+    def created(self) -> list:
+        """Services that have a client or resource so far (for startup diagnostics)"""
+        return sorted(set(self._clients) | set(self._resources))
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Startup Import-Time Benchmark
+Imports the agent (or the GUI app) in fresh interpreters with
+`python -X importtime`, prints where the time goes per top-level module,
+and checks the result against a startup budget. Also reports which heavy
+modules were loaded at import time; with lazy imports none should be.
+Needs config.py, but no AWS access.
+
+    python benchmark_startup.py                  # keyguard_agent, 5 runs
+    python benchmark_startup.py --target app --runs 10 --budget-ms 800
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+AGENT_DIR = Path(__file__).resolve().parent
+
+TARGETS = {
+    'agent': 'keyguard_agent',
+    'app': 'keyguard_app'
+}
+
+# Modules that should only load once the feature needing them runs
+HEAVY_MODULES = ('boto3', 'botocore', 'PIL', 'pynput', 'pystray')
+
+
+def run_once(module: str):
+    """
+    Import module in a fresh interpreter. Returns (total us, {direct import of
+    module: cumulative us}, heavy modules loaded)
+    """
+    statement = (
+        f"import {module}, sys; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=AGENT_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    total = 0
+    timings = {}
+    children = {}
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Nested imports are indented by two extra spaces per level and are
+        # printed before the module that imported them
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        if level == 1:
+            children[name.strip()] = int(cumulative)
+        elif level == 0:
+            total += int(cumulative)
+            if name.strip() == module:
+                timings.update(children)
+                timings[f"{module} (own code)"] = int(cumulative) - sum(children.values())
+            children = {}
+
+    heavy = [name for name in result.stdout.strip().split(',') if name]
+    return total, timings, heavy
+
+
+def benchmark(target='agent', runs=5, budget_ms=1000.0, top=15):
+    """Run the benchmark; returns True if the median total is within budget"""
+    module = TARGETS[target]
+    totals = []
+    samples = []
+    heavy_loaded = set()
+    for _ in range(runs):
+        total, timings, heavy = run_once(module)
+        totals.append(total)
+        samples.append(timings)
+        heavy_loaded.update(heavy)
+
+    names = set().union(*samples)
+    medians = {name: statistics.median(sample.get(name, 0) for sample in samples) for name in names}
+    total_ms = statistics.median(totals) / 1000
+
+    print(f"   import {module}: median {total_ms:.0f} ms over {runs} runs "
+          f"(min {min(totals) / 1000:.0f}, max {max(totals) / 1000:.0f})")
+    print()
+    print(f"   {'imported by ' + module:<32} {'ms':>8}  share")
+    for name, micros in sorted(medians.items(), key=lambda entry: -entry[1])[:top]:
+        print(f"   {name:<32} {micros / 1000:>8.1f}  {micros / 1000 / total_ms:6.1%}")
+    print()
+    print(f"   heavy modules loaded at import: {', '.join(sorted(heavy_loaded)) or 'none'}")
+
+    return total_ms <= budget_ms
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure KeyGuard360 startup import time')
+    parser.add_argument('--target', choices=sorted(TARGETS), default='agent')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=1000.0,
+                        help='Fail if the median import time exceeds this')
+    parser.add_argument('--top', type=int, default=15, help='Modules to list')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("KeyGuard360 Startup Benchmark")
+    print("=" * 60)
+    try:
+        within_budget = benchmark(args.target, args.runs, args.budget_ms, args.top)
+    except RuntimeError as e:
+        print(f"❌ Import failed: {e}")
+        sys.exit(1)
+    if within_budget:
+        print(f"✅ Within the {args.budget_ms:.0f} ms startup budget")
+    else:
+        print(f"❌ Over the {args.budget_ms:.0f} ms startup budget")
+    sys.exit(0 if within_budget else 1)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Threat Keyword Matcher Benchmark
+Measures KeywordMatcher build time, memory (states) and per-key cost for
+growing keyword lists, against a naive "check every keyword on every key"
+matcher, and checks both find the same matches.
+Runs offline - no AWS access or config.py needed.
+
+    python benchmark_threat_matcher.py [--keys 200000]
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from collections import Counter
+
+from threat_matcher import KeywordMatcher
+
+KEYWORD_COUNTS = (10, 100, 500, 1000)
+
+
+def random_keywords(count: int, rng: random.Random) -> list:
+    keywords = {'confidential', 'secret', 'password', 'credential', 'hack', 'exploit'}
+    while len(keywords) < count:
+        keywords.add(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12))))
+    return sorted(keywords)[:count]
+
+
+def random_keys(count: int, keywords: list, rng: random.Random) -> list:
+    """Typing-like stream: random words, spaces and backspaces with keywords mixed in"""
+    keys = []
+    while len(keys) < count:
+        word = rng.choice(keywords) if rng.random() < 0.05 else ''.join(
+            rng.choices(string.ascii_letters, k=rng.randint(2, 10)))
+        keys.extend(word)
+        if rng.random() < 0.05:
+            keys.append('Key.backspace')
+        keys.append('Key.space' if rng.random() < 0.9 else 'Key.enter')
+    return keys[:count]
+
+
+class NaiveMatcher:
+    """Reference: keep the typed text and test every keyword after every key"""
+
+    def __init__(self, keywords):
+        self.keywords = [keyword.lower() for keyword in keywords]
+        self.text = ''
+
+    def feed(self, key: str) -> tuple:
+        if key == 'Key.backspace':
+            self.text = self.text[:-1]
+            return ()
+        char = key.lower() if len(key) == 1 else (' ' if key == 'Key.space' else '\n')
+        self.text = (self.text + char)[-64:]
+        return tuple(keyword for keyword in self.keywords if self.text.endswith(keyword))
+
+
+def run(matcher, keys) -> (float, Counter):
+    matches = Counter()
+    started = time.perf_counter()
+    for key in keys:
+        for keyword in matcher.feed(key):
+            matches[keyword] += 1
+    return time.perf_counter() - started, matches
+
+
+def benchmark(key_count=200000, naive_keys=20000):
+    """Returns True if the matcher agrees with the naive reference at every size"""
+    rng = random.Random(360)
+    agreed = True
+
+    print(f"   {'keywords':>8} {'states':>8} {'build ms':>9} {'ns/key':>8} {'naive ns/key':>13} {'matches':>8}")
+    for count in KEYWORD_COUNTS:
+        keywords = random_keywords(count, rng)
+        keys = random_keys(key_count, keywords, rng)
+
+        started = time.perf_counter()
+        matcher = KeywordMatcher(keywords)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        elapsed, matches = run(matcher, keys)
+
+        # The naive matcher is O(keywords) per key, so only time a prefix
+        matcher.reset()
+        _, prefix_matches = run(matcher, keys[:naive_keys])
+        naive_elapsed, naive_matches = run(NaiveMatcher(keywords), keys[:naive_keys])
+        if prefix_matches != naive_matches:
+            agreed = False
+            print(f"   mismatch with {count} keywords: {prefix_matches} != {naive_matches}")
+
+        print(f"   {count:>8} {matcher.states:>8} {build_ms:>9.1f} "
+              f"{elapsed / len(keys) * 1e9:>8.0f} {naive_elapsed / naive_keys * 1e9:>13.0f} "
+              f"{sum(matches.values()):>8}")
+
+    return agreed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the THREAT_KEYWORDS matcher')
+    parser.add_argument('--keys', type=int, default=200000, help='Keystrokes per run')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("KeyGuard360 Threat Keyword Matcher Benchmark")
+    print("=" * 60)
+    success = benchmark(args.keys)
+    print("✅ Matcher agrees with the naive reference" if success else "❌ Matcher results differ")
+    sys.exit(0 if success else 1)
@@ -2,17 +2,12 @@
 """
 Disable API Gateway caching for instant dashboard updates
 """
-import boto3
 from config import config
+from aws_clients import AwsClientFactory
 
 def disable_api_cache():
     """Disable caching on the API Gateway to get real-time updates"""
-    client = boto3.client(
-        'apigateway',
-        aws_access_key_id=config.AWS_ACCESS_KEY,
-        aws_secret_access_key=config.AWS_SECRET_KEY,
-        region_name=config.AWS_REGION
-    )
+    client = AwsClientFactory(config).client('apigateway')
     
     # Your API Gateway ID (extracted from your API URL)
     api_id = 'cw5b26zcta'
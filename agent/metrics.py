@@ -0,0 +1,192 @@
+"""
+KeyGuard360 Agent Metrics
+Per-stage latency histograms, byte and error counters, and gauges
+(queue depths, AWS rates...) for the agent pipeline, rendered in the
+Prometheus text format on a loopback-only HTTP endpoint and summarised
+for the device heartbeat.
+"""
+
+import bisect
+import ipaddress
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger('KeyGuard360')
+
+# Pipeline stages measured by the agent
+STAGES = ('grab', 'encode', 's3_upload', 'dynamodb_write', 'sns_publish', 'keylog_flush')
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative counts are computed when rendering)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate from bucket bounds (upper bound of the bucket holding the q-th value)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+
+class Metrics:
+    """Thread-safe registry for the agent's stage metrics and gauges"""
+
+    def __init__(self, stages=STAGES):
+        self._lock = threading.Lock()
+        self.latency = {stage: Histogram() for stage in stages}
+        self.bytes = {stage: 0 for stage in stages}
+        self.errors = {stage: 0 for stage in stages}
+        self._gauges = []
+
+    @contextmanager
+    def time(self, stage: str):
+        """Time a block as one run of a stage; an exception counts as an error and is re-raised"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.observe(stage, time.perf_counter() - started, error=True)
+            raise
+        self.observe(stage, time.perf_counter() - started)
+
+    def observe(self, stage: str, seconds: float, error=False, nbytes=0):
+        with self._lock:
+            self.latency[stage].observe(seconds)
+            if error:
+                self.errors[stage] += 1
+            self.bytes[stage] += nbytes
+
+    def add_bytes(self, stage: str, nbytes: int):
+        with self._lock:
+            self.bytes[stage] += nbytes
+
+    def add_error(self, stage: str):
+        with self._lock:
+            self.errors[stage] += 1
+
+    def gauge(self, name: str, help_text: str, func, label=None):
+        """
+        Register a value read at render time. func returns a number, or a
+        {label value: number} dict when label names the label.
+        """
+        self._gauges.append((name, help_text, func, label))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines.append('# HELP keyguard_stage_latency_seconds Latency of each agent pipeline stage')
+            lines.append('# TYPE keyguard_stage_latency_seconds histogram')
+            for stage, histogram in self.latency.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'keyguard_stage_latency_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'keyguard_stage_latency_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'keyguard_stage_latency_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'keyguard_stage_latency_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+            lines.append('# HELP keyguard_stage_bytes_total Bytes produced or sent by each stage')
+            lines.append('# TYPE keyguard_stage_bytes_total counter')
+            lines.extend(f'keyguard_stage_bytes_total{{stage="{stage}"}} {value}' for stage, value in self.bytes.items())
+
+            lines.append('# HELP keyguard_stage_errors_total Failed runs of each stage')
+            lines.append('# TYPE keyguard_stage_errors_total counter')
+            lines.extend(f'keyguard_stage_errors_total{{stage="{stage}"}} {value}' for stage, value in self.errors.items())
+
+        for name, help_text, func, label in self._gauges:
+            try:
+                value = func()
+            except Exception as e:
+                logger.debug(f"Metric {name} unavailable: {e}")
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            if label:
+                lines.extend(f'{name}{{{label}="{key}"}} {item}' for key, item in value.items())
+            else:
+                lines.append(f'{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> dict:
+        """Compact per-stage summary for the device heartbeat"""
+        with self._lock:
+            return {
+                stage: {
+                    'count': histogram.count,
+                    'p50_ms': round(histogram.quantile(0.5) * 1000),
+                    'p95_ms': round(histogram.quantile(0.95) * 1000),
+                    'errors': self.errors[stage],
+                    'bytes': self.bytes[stage]
+                }
+                for stage, histogram in self.latency.items()
+                if histogram.count
+            }
+
+
+class MetricsServer:
+    """Serves /metrics on the loopback interface only"""
+
+    def __init__(self, metrics: Metrics, port: int, host='127.0.0.1'):
+        if not ipaddress.ip_address(host).is_loopback:
+            raise ValueError(f"Metrics endpoint must bind to a loopback address, not {host}")
+        self.metrics = metrics
+        self.address = (host, port)
+        self._server = None
+
+    def start(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Scrapes would otherwise print a line each to stderr
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer(self.address, Handler)
+        except OSError as e:
+            logger.error(f"Metrics endpoint unavailable on {self.address[0]}:{self.address[1]}: {e}")
+            return
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True).start()
+        logger.info(f"Metrics endpoint on http://{self.address[0]}:{self.address[1]}/metrics")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
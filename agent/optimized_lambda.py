@@ -1,15 +1,97 @@
 """
 Optimized Lambda function for KeyGuard360 Dashboard
-This version uses DynamoDB Query with indexes for 10x faster response
+Reads the newest logs from the time-bucket-index GSI (partition key: the
+UTC day of the log, sort key: timestamp), walking days backwards until the
+page is full, so a page costs the same however large the table grows.
+?device_id= reads one device's logs from the device-time-index GSI instead.
+Older pages are fetched with the opaque cursor returned in X-Next-Cursor.
+Pollers pass the X-Sync-Token of their last response as ?since= to get
+the logs stamped after it, re-sending the last SYNC_OVERLAP_SECONDS for
+logs that arrived late (clients dedupe by log_id), and every response
+carries an ETag so an unchanged one is answered with a bodiless 304.
+Lists are summaries (keylog batches and other large data are left out,
+?view=full keeps them); /logs/{log_id} returns one complete log. Larger
+bodies are gzip/br compressed when the client's Accept-Encoding allows.
+/devices lists the devices table (last_seen is kept current by heartbeats).
+/stats serves the hourly/daily/per-device counters rollup_lambda keeps.
 """
 
+import base64
+import gzip
+import hashlib
 import json
+import os
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
 import boto3
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
 from decimal import Decimal
 
+try:
+    import brotli  # optional: not in the Lambda runtime, ship it in a layer
+except ImportError:
+    brotli = None
+
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table('keyguard360-logs')
+rollups_table = dynamodb.Table('keyguard360-rollups')
+devices_table = dynamodb.Table('keyguard360-devices')
+
+# GSIs (see setup_log_index.py): time_bucket (YYYY-MM-DD, set by the agent)
+# + timestamp for the global feed, device_id + timestamp for one device
+TIME_INDEX = 'time-bucket-index'
+DEVICE_INDEX = 'device-time-index'
+
+PROJECTION = {
+    'ProjectionExpression': 'log_id, device_id, #ts, #tp, #dt, #usr, #cnt',
+    'ExpressionAttributeNames': {
+        '#ts': 'timestamp',
+        '#tp': 'type',
+        '#dt': 'data',
+        '#usr': 'user',
+        '#cnt': 'count'
+    }
+}
+
+DEVICE_PROJECTION = {
+    'ProjectionExpression': 'device_id, hostname, #usr, os, #st, last_seen, heartbeat_interval, ip_address, #loc',
+    'ExpressionAttributeNames': {
+        '#usr': 'user',
+        '#st': 'status',
+        '#loc': 'location'
+    }
+}
+
+# Shards of the per-device rollups (devices#0..n-1); must match rollup_lambda
+DEVICE_SHARDS = int(os.environ.get('ROLLUP_DEVICE_SHARDS', '16'))
+
+# Summary items leave out keylog data and any data larger than this; it is
+# still read (a projection doesn't lower the read cost), just not sent
+SUMMARY_DATA_BYTES = int(os.environ.get('LOG_SUMMARY_DATA_BYTES', '2048'))
+SUMMARY_OMIT_TYPES = {'keylog'}
+
+# Bodies smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = 1024
+
+DEFAULT_LIMIT = 300
+MAX_LIMIT = 1000
+
+# Queries one request may spend walking back over (mostly empty) days
+MAX_QUERIES = int(os.environ.get('LOG_MAX_QUERIES', '31'))
+# Day before which there are no logs; pagination stops there (optional)
+OLDEST_BUCKET = os.environ.get('LOG_OLDEST_BUCKET', '')
+# A sync token re-reads this far back: agent timestamps are not arrival order
+# (batching, upload queues, clock skew), so a log can land after a newer one
+SYNC_OVERLAP_SECONDS = int(os.environ.get('LOG_SYNC_OVERLAP_SECONDS', '120'))
+# Without it, pagination stops after this many consecutive days without logs
+MAX_EMPTY_BUCKETS = int(os.environ.get('LOG_MAX_EMPTY_DAYS', str(MAX_QUERIES)))
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type, If-None-Match',
+    'Access-Control-Allow-Methods': 'GET,OPTIONS',
+    'Access-Control-Expose-Headers': 'ETag, X-Next-Cursor, X-Sync-Token'
+}
 
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -17,53 +99,405 @@ class DecimalEncoder(json.JSONEncoder):
             return float(obj)
         return super(DecimalEncoder, self).default(obj)
 
-def lambda_handler(event, context):
+class BadRequest(ValueError):
+    """Invalid query parameters (answered with a 400)"""
+
+def time_bucket(timestamp: str) -> str:
+    """Partition key of a log in the time index: its UTC day"""
+    return timestamp[:10]
+
+def previous_bucket(bucket: str) -> str:
+    return (datetime.strptime(bucket, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
+
+def encode_cursor(state: dict) -> str:
+    """
+    Opaque token: a page cursor (the day/device and key the next page
+    continues after) or a sync token (see sync_token)
+    """
+    raw = json.dumps(state, separators=(',', ':'), cls=DecimalEncoder)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_token(token: str) -> dict:
+    state = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    if not isinstance(state, dict):
+        raise ValueError(token)
+    return state
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        state = decode_token(cursor)
+        start_key = state['k']
+        if start_key is not None and not (
+                isinstance(start_key, dict)
+                and all(isinstance(value, str) for value in start_key.values())):
+            raise ValueError(start_key)
+    except (ValueError, KeyError, TypeError) as e:
+        raise BadRequest(f"Invalid cursor: {cursor}") from e
+    return state
+
+def sync_token(items: list, since=None) -> str:
+    """Token for ?since=: the newest timestamp seen so far (never moves back)"""
+    timestamps = [item['timestamp'] for item in items] + ([since[1]] if since else [])
+    return encode_cursor({'t': max(timestamps)}) if timestamps else None
+
+def parse_since(value):
+    """
+    ?since= as (timestamp to read from, inclusive; newest timestamp already
+    seen): a sync token reads from SYNC_OVERLAP_SECONDS before its time, so
+    repeats some logs; an ISO timestamp reads from exactly that time
+    """
+    if not value:
+        return None
+    try:
+        newest = decode_token(value)['t']
+        start = datetime.fromisoformat(newest.replace('Z', '+00:00')) - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+        return start.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S'), newest
+    except (ValueError, KeyError, TypeError, AttributeError):
+        pass
+    try:
+        datetime.strptime(value[:10], '%Y-%m-%d')
+    except ValueError:
+        raise BadRequest(f"Invalid since: {value}")
+    return value, value
+
+def summarize(item: dict) -> dict:
     """
-    Optimized handler that returns only the most recent 300 logs
-    sorted by timestamp (newest first)
+    List view of a log: everything but a keylog's or an oversized data,
+    which is replaced by its size (data_bytes); /logs/{log_id} has it all
     """
+    data = item.get('data')
+    if data is None:
+        return item
+    size = len(data if isinstance(data, str) else json.dumps(data, cls=DecimalEncoder))
+    if item.get('type') not in SUMMARY_OMIT_TYPES and size <= SUMMARY_DATA_BYTES:
+        return item
+    summary = {key: value for key, value in item.items() if key != 'data'}
+    summary['data_bytes'] = size
+    return summary
+
+def get_log(log_id: str):
+    """One complete log from the base table, or None"""
+    return table.get_item(Key={'log_id': log_id}).get('Item')
+
+def detail_log_id(event: dict, params: dict):
+    """log_id of a /logs/{log_id} (or ?log_id=) request, else None"""
+    log_id = (event.get('pathParameters') or {}).get('log_id') or params.get('log_id')
+    if log_id:
+        return log_id
+    parts = (event.get('path') or '').rstrip('/').split('/')
+    if len(parts) >= 2 and parts[-2] == 'logs' and parts[-1] != 'stats':
+        return parts[-1]
+    return None
+
+def parse_int(params: dict, name: str, default: int, maximum: int) -> int:
+    value = params.get(name)
+    if value is None:
+        return default
     try:
-        # Scan with limit and sort
-        response = table.scan(
-            Limit=300,
-            ProjectionExpression='log_id, device_id, #ts, #tp, #dt, #usr',
-            ExpressionAttributeNames={
-                '#ts': 'timestamp',
-                '#tp': 'type',
-                '#dt': 'data',
-                '#usr': 'user'
-            }
-        )
-        
-        items = response.get('Items', [])
-        
-        # Sort by timestamp (newest first)
-        sorted_items = sorted(
-            items,
-            key=lambda x: x.get('timestamp', ''),
-            reverse=True
-        )
-        
+        number = int(value)
+    except ValueError:
+        raise BadRequest(f"Invalid {name}: {value}")
+    return max(1, min(number, maximum))
+
+def query_newest(limit: int, since=None, cursor=None):
+    """
+    Newest-first page of up to limit logs (only those after since, see
+    parse_since), and the cursor for the next (older) page, or None once
+    since or OLDEST_BUCKET is reached, or after MAX_EMPTY_BUCKETS days in a
+    row without logs. Callers pass the same since along with the cursor.
+    """
+    if cursor:
+        state = decode_cursor(cursor)
+        bucket, start_key, empty = state.get('b'), state['k'], state.get('e', 0)
+        try:
+            datetime.strptime(bucket, '%Y-%m-%d')
+            empty = int(empty)
+        except (TypeError, ValueError):
+            raise BadRequest(f"Invalid cursor: {cursor}")
+    else:
+        bucket, start_key, empty = datetime.now(timezone.utc).strftime('%Y-%m-%d'), None, 0
+
+    oldest_bucket = time_bucket(since[0]) if since else OLDEST_BUCKET
+
+    items = []
+    for _ in range(MAX_QUERIES):
+        if (oldest_bucket and bucket < oldest_bucket) or empty >= MAX_EMPTY_BUCKETS:
+            return items, None
+
+        condition = Key('time_bucket').eq(bucket)
+        if since and bucket == oldest_bucket:
+            condition &= Key('timestamp').gte(since[0])
+        kwargs = {
+            'IndexName': TIME_INDEX,
+            'KeyConditionExpression': condition,
+            'ScanIndexForward': False,
+            'Limit': limit - len(items),
+            **PROJECTION
+        }
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+        response = table.query(**kwargs)
+
+        page = response.get('Items', [])
+        items.extend(page)
+        day_started = not start_key
+        start_key = response.get('LastEvaluatedKey')
+        if page:
+            empty = 0
+        elif day_started and not start_key:
+            empty += 1
+        if not start_key:
+            # Day exhausted, continue with the one before
+            bucket = previous_bucket(bucket)
+        if len(items) >= limit:
+            break
+
+    if empty >= MAX_EMPTY_BUCKETS:
+        return items, None
+    # Also returned for a short page when MAX_QUERIES ran out on empty days
+    return items, encode_cursor({'b': bucket, 'k': start_key, 'e': empty})
+
+def query_device(device_id: str, limit: int, types=None, since=None, until=None, cursor=None):
+    """
+    Newest-first page of one device's logs, optionally only the given types
+    and timestamps from since (see parse_since) to until (inclusive ISO
+    strings, compared as strings), and the cursor for the next page (None
+    after the last one)
+    """
+    start_key = None
+    if cursor:
+        state = decode_cursor(cursor)
+        if state.get('d') != device_id:
+            raise BadRequest("Cursor belongs to a different device")
+        start_key = state['k']
+
+    condition = Key('device_id').eq(device_id)
+    if since and until:
+        condition &= Key('timestamp').between(since[0], until)
+    elif since:
+        condition &= Key('timestamp').gte(since[0])
+    elif until:
+        condition &= Key('timestamp').lte(until)
+
+    items = []
+    for _ in range(MAX_QUERIES):
+        kwargs = {
+            'IndexName': DEVICE_INDEX,
+            'KeyConditionExpression': condition,
+            'ScanIndexForward': False,
+            'Limit': limit - len(items),
+            **PROJECTION
+        }
+        if types:
+            # Filtered after the read: a page may need several queries to fill
+            kwargs['FilterExpression'] = Attr('type').is_in(types)
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+        response = table.query(**kwargs)
+
+        items.extend(response.get('Items', []))
+        start_key = response.get('LastEvaluatedKey')
+        if not start_key or len(items) >= limit:
+            break
+
+    return items, encode_cursor({'d': device_id, 'k': start_key}) if start_key else None
+
+def list_devices() -> list:
+    """Status fields of every device (one small item per device, so a scan is fine)"""
+    kwargs = dict(DEVICE_PROJECTION)
+    devices = []
+    while True:
+        response = devices_table.scan(**kwargs)
+        devices.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return sorted(devices, key=lambda device: device['device_id'])
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def query_rollups(scope: str, since: str) -> dict:
+    """Rollup items of a scope from period since onwards, by period"""
+    kwargs = {'KeyConditionExpression': Key('scope').eq(scope) & Key('period').gte(since)}
+    items = {}
+    while True:
+        response = rollups_table.query(**kwargs)
+        for item in response.get('Items', []):
+            items[item['period']] = item
+        if 'LastEvaluatedKey' not in response:
+            return items
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def counters(item: dict, prefix: str) -> dict:
+    return {key[len(prefix):]: int(value) for key, value in item.items() if key.startswith(prefix)}
+
+def get_stats(hours=24, days=7, top=10) -> dict:
+    """
+    Event counts for the last hours and days (UTC periods, oldest first,
+    missing periods as zeros) and the most active devices over the days
+    """
+    now = datetime.now(timezone.utc)
+    hour_periods = [(now - timedelta(hours=i)).strftime('%Y-%m-%dT%H') for i in reversed(range(hours))]
+    day_periods = [(now - timedelta(days=i)).strftime('%Y-%m-%d') for i in reversed(range(days))]
+
+    hour_items = query_rollups('hour', hour_periods[0])
+    day_items = query_rollups('day', day_periods[0])
+    device_items = defaultdict(Counter)
+    for scope in (f'devices#{shard}' for shard in range(DEVICE_SHARDS)):
+        for period, item in query_rollups(scope, day_periods[0]).items():
+            device_items[period].update(counters(item, 'device:'))
+
+    def period_counts(period, item):
+        return {'period': period, 'events': int(item.get('events', 0)), 'types': counters(item, 'type:')}
+
+    device_events = Counter()
+    last_active = {}
+    day_stats = []
+    for period in day_periods:
+        per_device = device_items.get(period, {})
+        device_events.update(per_device)
+        last_active.update(dict.fromkeys(per_device, period))
+        day_stats.append({**period_counts(period, day_items.get(period, {})), 'active_devices': len(per_device)})
+
+    totals = Counter()
+    for day in day_stats:
+        totals.update(day['types'])
+
+    return {
+        'hours': [period_counts(period, hour_items.get(period, {})) for period in hour_periods],
+        'days': day_stats,
+        'totals': {'events': sum(day['events'] for day in day_stats), 'types': dict(totals)},
+        'devices': {
+            'active': len(device_events),
+            'top': [
+                {'device_id': device_id, 'events': events, 'last_active': last_active[device_id]}
+                for device_id, events in device_events.most_common(top)
+            ]
+        }
+    }
+
+def accepted_encoding(accept_encoding: str):
+    """Best of br/gzip the client accepts (q > 0), or None"""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    def allowed(encoding):
+        return accepted.get(encoding, accepted.get('*', 0.0)) > 0
+
+    if brotli and allowed('br'):
+        return 'br'
+    if allowed('gzip'):
+        return 'gzip'
+    return None
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+def response(status_code: int, body, headers=None, event=None):
+    """
+    JSON response. 200s get an ETag of their body; when the request's
+    If-None-Match already has it, a 304 without a body is sent instead.
+    Bodies of COMPRESS_MIN_BYTES or more are compressed (base64 encoded for
+    API Gateway) if the request's Accept-Encoding allows br or gzip
+    """
+    payload = json.dumps(body, cls=DecimalEncoder).encode('utf-8')
+    request_headers = {key.lower(): value for key, value in ((event or {}).get('headers') or {}).items()}
+    headers = {
+        **CORS_HEADERS,
+        # Browsers may keep the response but must revalidate it (If-None-Match) every time
+        'Cache-Control': 'no-cache',
+        'Vary': 'Accept-Encoding',
+        **(headers or {})
+    }
+
+    if status_code == 200:
+        # Weak: the same tag stands for the plain and the compressed body
+        etag = 'W/"' + hashlib.sha256(payload).hexdigest()[:32] + '"'
+        headers['ETag'] = etag
+        if_none_match = request_headers.get('if-none-match', '')
+        tags = (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))
+        if if_none_match.strip() == '*' or etag.removeprefix('W/') in tags:
+            return {'statusCode': 304, 'headers': headers, 'body': ''}
+
+    encoding = accepted_encoding(request_headers.get('accept-encoding', ''))
+    if encoding and len(payload) >= COMPRESS_MIN_BYTES:
+        headers['Content-Encoding'] = encoding
         return {
-            'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type',
-                'Access-Control-Allow-Methods': 'GET,OPTIONS',
-                'Cache-Control': 'no-cache, no-store, must-revalidate',
-                'Pragma': 'no-cache',
-                'Expires': '0'
-            },
-            'body': json.dumps(sorted_items[:300], cls=DecimalEncoder)
+            'statusCode': status_code,
+            'headers': headers,
+            'body': base64.b64encode(compress(payload, encoding)).decode('ascii'),
+            'isBase64Encoded': True
         }
-        
+
+    return {'statusCode': status_code, 'headers': headers, 'body': payload.decode('utf-8')}
+
+def lambda_handler(event, context):
+    """
+    Returns the newest logs (default 300, ?limit= up to 1000) as a JSON
+    array, newest first; ?cursor= with a previous X-Next-Cursor value
+    continues with older logs.
+    ?device_id= returns only that device's logs, optionally narrowed with
+    ?type= (comma-separated) and ?since= / ?until= (ISO timestamps, inclusive).
+    ?since= also takes the X-Sync-Token of an earlier response, which
+    returns the logs stamped after it plus the SYNC_OVERLAP_SECONDS before.
+    Items are summaries unless ?view=full is passed; GET /logs/{log_id}
+    (or ?log_id=) returns the complete log.
+    GET /devices returns every device's status and last_seen.
+    GET /stats returns the rollups (?hours=24, ?days=7, ?top=10 devices)
+    """
+    try:
+        params = event.get('queryStringParameters') or {}
+        path = event.get('path') or event.get('resource') or ''
+        if path.rstrip('/').endswith('/stats'):
+            return response(200, get_stats(
+                hours=parse_int(params, 'hours', 24, 168),
+                days=parse_int(params, 'days', 7, 90),
+                top=parse_int(params, 'top', 10, 100)
+            ), event=event)
+        if path.rstrip('/').endswith('/devices'):
+            return response(200, list_devices(), event=event)
+
+        log_id = detail_log_id(event, params)
+        if log_id:
+            item = get_log(log_id)
+            if item is None:
+                return response(404, {'error': f"Log not found: {log_id}"}, event=event)
+            return response(200, item, event=event)
+
+        limit = parse_int(params, 'limit', DEFAULT_LIMIT, MAX_LIMIT)
+        since = parse_since(params.get('since'))
+        if params.get('device_id'):
+            types = [t for t in (params.get('type') or '').split(',') if t]
+            items, next_cursor = query_device(
+                params['device_id'],
+                limit,
+                types=types,
+                since=since,
+                until=params.get('until'),
+                cursor=params.get('cursor')
+            )
+        else:
+            items, next_cursor = query_newest(limit, since=since, cursor=params.get('cursor'))
+
+        if params.get('view') != 'full':
+            items = [summarize(item) for item in items]
+
+        headers = {'X-Next-Cursor': next_cursor} if next_cursor else {}
+        if not params.get('cursor'):
+            token = sync_token(items, since)
+            if token:
+                headers['X-Sync-Token'] = token
+        return response(200, items, headers, event=event)
+
+    except BadRequest as e:
+        return response(400, {'error': str(e)}, event=event)
     except Exception as e:
         print(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Cache-Control': 'no-cache'
-            },
-            'body': json.dumps({'error': str(e)})
-        }
+        return response(500, {'error': str(e)}, event=event)
@@ -0,0 +1,102 @@
+"""
+KeyGuard360 Process Monitor
+Incremental scan for SUSPICIOUS_PROCESSES and BLOCKED_APPS: each scan only
+diffs the set of running PIDs against the previous one, looks up the name
+of new PIDs once (cached until the PID goes away), and matches names with
+one precompiled pattern per category. Only start/stop events of matching
+processes are reported.
+"""
+
+import logging
+import re
+import time
+
+import psutil
+
+logger = logging.getLogger('KeyGuard360')
+
+# Checked in this order; a name matching both is reported as blocked
+CATEGORIES = ('blocked', 'suspicious')
+
+
+def compile_patterns(names) -> re.Pattern:
+    """One case-insensitive alternation for a list of name fragments (None if empty)"""
+    names = sorted({name.lower() for name in names if name}, key=len, reverse=True)
+    if not names:
+        return None
+    return re.compile('|'.join(re.escape(name) for name in names), re.IGNORECASE)
+
+
+class ProcessMonitor:
+    """Reports when watched processes start or stop"""
+
+    def __init__(self, suspicious, blocked, on_event=None):
+        """
+        suspicious / blocked: process name fragments (matched case-insensitively)
+        on_event: called with (event, info) where event is 'process_started' or
+                  'process_stopped' and info has pid, name and category
+        """
+        self.patterns = {
+            'blocked': compile_patterns(blocked),
+            'suspicious': compile_patterns(suspicious)
+        }
+        self.on_event = on_event
+
+        # pid -> match info, or None for processes that matched nothing
+        self._known = {}
+        self.stats = {
+            'scans': 0,
+            'processes': 0,
+            'watched': 0,
+            'last_scan_ms': 0.0
+        }
+
+    def match(self, name: str):
+        """Category of a process name, or None"""
+        for category in CATEGORIES:
+            pattern = self.patterns[category]
+            if pattern is not None and pattern.search(name):
+                return category
+        return None
+
+    def scan(self) -> list:
+        """Diff running processes against the last scan; returns the events emitted"""
+        started = time.perf_counter()
+        pids = set(psutil.pids())
+        known = self._known
+        events = []
+
+        for pid in known.keys() - pids:
+            info = known.pop(pid)
+            if info is not None:
+                events.append(('process_stopped', info))
+
+        for pid in pids - known.keys():
+            info = self._inspect(pid)
+            known[pid] = info
+            if info is not None:
+                events.append(('process_started', info))
+
+        self.stats['scans'] += 1
+        self.stats['processes'] = len(known)
+        self.stats['watched'] = sum(1 for info in known.values() if info is not None)
+        self.stats['last_scan_ms'] = round((time.perf_counter() - started) * 1000, 2)
+
+        if self.on_event:
+            for event, info in events:
+                try:
+                    self.on_event(event, info)
+                except Exception as e:
+                    logger.error(f"Error handling {event} for {info['name']}: {e}")
+        return events
+
+    def _inspect(self, pid: int):
+        """Name lookup for a newly seen PID (the only per-process work a scan does)"""
+        try:
+            name = psutil.Process(pid).name()
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+        category = self.match(name)
+        if category is None:
+            return None
+        return {'pid': pid, 'name': name, 'category': category}
@@ -0,0 +1,213 @@
+"""
+KeyGuard360 AWS Rate Limiter
+Per-service token bucket whose rate adapts to throttling responses (AIMD:
+additive increase on success, multiplicative decrease on throttle), plus a
+retry budget so retries stay a small fraction of normal traffic. When a
+region is struggling, every agent in the fleet backs off instead of piling
+retries on top of it.
+"""
+
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger('KeyGuard360')
+
+# Error codes AWS uses to say "slow down"
+THROTTLE_ERROR_CODES = frozenset({
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottled',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'RequestLimitExceeded',
+    'SlowDown',
+    'LimitExceededException'
+})
+
+# Server-side errors that are worth a (budgeted) retry
+TRANSIENT_ERROR_CODES = frozenset({
+    'InternalError',
+    'InternalFailure',
+    'InternalServerError',
+    'ServiceUnavailable',
+    'RequestTimeout',
+    'RequestTimeoutException'
+})
+
+
+def error_code(error) -> str:
+    """AWS error code of a botocore ClientError, or '' for anything else"""
+    response = getattr(error, 'response', None) or {}
+    return response.get('Error', {}).get('Code', '')
+
+
+class RetryBudget:
+    """
+    Retries are paid for with tokens: every request deposits `ratio` tokens
+    and every retry spends one, with a small reserve refilled over time so a
+    quiet agent can still retry. Caps retries at roughly ratio * traffic.
+    """
+
+    def __init__(self, ratio=0.1, reserve_per_second=0.2, max_tokens=10.0):
+        self.ratio = ratio
+        self.reserve_per_second = reserve_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.exhausted = 0
+
+    def _refill(self, amount=0.0):
+        now = time.monotonic()
+        amount += (now - self._updated) * self.reserve_per_second
+        self._updated = now
+        self._tokens = min(self.max_tokens, self._tokens + amount)
+
+    def record_request(self):
+        with self._lock:
+            self._refill(self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one retry token; False means the caller should give up now"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            self.exhausted += 1
+            return False
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class AdaptiveRateLimiter:
+    """Token bucket for one AWS service with an AIMD-adjusted refill rate"""
+
+    def __init__(self, name: str, rate: float, min_rate=0.1, max_rate=None, increase=0.05,
+                 decrease=0.5, cooldown=1.0, max_retries=3, retry_budget=None):
+        """
+        rate:      starting requests per second (also the ceiling unless max_rate is set)
+        increase:  requests/second added after each successful call
+        decrease:  factor applied to the rate on throttling, at most once per cooldown
+                   seconds so one burst of throttle responses counts as one signal
+        """
+        self.name = name
+        self.rate = float(rate)
+        self.min_rate = min_rate
+        self.max_rate = float(max_rate or rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.max_retries = max_retries
+        self.budget = retry_budget or RetryBudget()
+
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'requests': 0,
+            'throttles': 0,
+            'retries': 0,
+            'gave_up': 0,
+            'waited_ms': 0.0
+        }
+
+    def acquire(self, timeout=None) -> bool:
+        """Block until a request may be sent; False if timeout expired first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                burst = max(1.0, self.rate)
+                self._tokens = min(burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self.stats['requests'] += 1
+                    self.stats['waited_ms'] += (now - started) * 1000
+                    break
+                wait = (1.0 - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+        self.budget.record_request()
+        return True
+
+    def record_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def record_throttle(self):
+        with self._lock:
+            self.stats['throttles'] += 1
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            previous = self.rate
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            # Drop saved-up tokens so the new rate applies immediately
+            self._tokens = min(self._tokens, 1.0)
+        if self.rate < previous:
+            logger.warning(f"AWS {self.name} throttled, rate {previous:.2f} -> {self.rate:.2f} req/s")
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff: random in [0, 0.1 * 2^attempt] seconds, max 5s"""
+        return random.uniform(0, min(5.0, 0.1 * (2 ** attempt)))
+
+    def should_retry(self, attempt: int) -> bool:
+        """True if another attempt is allowed by max_retries and the retry budget"""
+        allowed = attempt <= self.max_retries and self.budget.try_spend()
+        with self._lock:
+            self.stats['retries' if allowed else 'gave_up'] += 1
+        return allowed
+
+    def call(self, func, *args, **kwargs):
+        """
+        Rate-limited AWS call. Throttling and transient server errors are
+        retried within the budget; anything else (including connection
+        errors, which the spool handles) is raised immediately.
+        """
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                code = error_code(e)
+                if code in THROTTLE_ERROR_CODES:
+                    self.record_throttle()
+                elif code not in TRANSIENT_ERROR_CODES:
+                    raise
+                attempt += 1
+                if not self.should_retry(attempt):
+                    raise
+                time.sleep(self.backoff(attempt))
+                continue
+            self.record_success()
+            return result
+
+    def snapshot(self) -> dict:
+        """Current rate and counters, for logs and the device status heartbeat"""
+        return {
+            'rate': round(self.rate, 2),
+            'retry_tokens': round(self.budget.tokens, 2),
+            **{key: round(value, 1) if isinstance(value, float) else value
+               for key, value in self.stats.items()}
+        }
@@ -0,0 +1,101 @@
+"""
+KeyGuard360 Resource Governor
+Samples the agent's own CPU and memory with psutil and steps through
+degradation levels when it goes over budget (smaller screenshots, a
+cheaper encoder, longer intervals, fewer heartbeats), stepping back
+once there is headroom again.
+"""
+
+import logging
+
+import psutil
+
+logger = logging.getLogger('KeyGuard360')
+
+# Each level keeps the savings of the ones before it
+DEGRADATION_LEVELS = (
+    {'name': 'normal'},
+    {'name': 'reduced_resolution', 'screenshot_reduce': 2},
+    {'name': 'cheap_encoder', 'screenshot_reduce': 2, 'screenshot_format': 'jpeg'},
+    {'name': 'longer_intervals', 'screenshot_reduce': 2, 'screenshot_format': 'jpeg',
+     'interval_factor': 2},
+    {'name': 'fewer_heartbeats', 'screenshot_reduce': 2, 'screenshot_format': 'jpeg',
+     'interval_factor': 3, 'status_factor': 4},
+)
+
+
+class ResourceGovernor:
+    """Keeps the agent process within a CPU/RSS budget by degrading in steps"""
+
+    def __init__(self, cpu_budget=10.0, rss_budget_mb=250, escalate_after=2, relax_after=4,
+                 headroom=0.5, on_change=None):
+        """
+        cpu_budget:     % of one core the agent may average between samples
+        rss_budget_mb:  resident memory budget
+        escalate_after: consecutive over-budget samples before degrading one level
+        relax_after:    consecutive samples below headroom * budget before restoring one level
+        on_change:      called with (level, profile) when the level changes
+        """
+        self.cpu_budget = cpu_budget
+        self.rss_budget_mb = rss_budget_mb
+        self.escalate_after = escalate_after
+        self.relax_after = relax_after
+        self.headroom = headroom
+        self.on_change = on_change
+
+        self.level = 0
+        self.cpu_percent = 0.0
+        self.rss_mb = 0.0
+        self._over = 0
+        self._under = 0
+
+        self._process = psutil.Process()
+        # Prime the counter: cpu_percent(interval=None) reports usage since the previous call
+        self._process.cpu_percent(interval=None)
+
+    @property
+    def profile(self) -> dict:
+        return DEGRADATION_LEVELS[self.level]
+
+    def sample(self):
+        """Measure the agent process and adjust the degradation level"""
+        self.cpu_percent = self._process.cpu_percent(interval=None)
+        self.rss_mb = self._process.memory_info().rss / (1024 * 1024)
+
+        over = self.cpu_percent > self.cpu_budget or self.rss_mb > self.rss_budget_mb
+        under = (self.cpu_percent < self.cpu_budget * self.headroom
+                 and self.rss_mb < self.rss_budget_mb * self.headroom)
+
+        self._over = self._over + 1 if over else 0
+        self._under = self._under + 1 if under else 0
+
+        if self._over >= self.escalate_after and self.level < len(DEGRADATION_LEVELS) - 1:
+            self._set_level(self.level + 1)
+        elif self._under >= self.relax_after and self.level > 0:
+            self._set_level(self.level - 1)
+
+    def snapshot(self) -> dict:
+        """Current level and measurements, for the device status"""
+        return {
+            'degradation_level': self.level,
+            'degradation_profile': self.profile['name'],
+            'agent_cpu_percent': round(self.cpu_percent, 1),
+            'agent_rss_mb': round(self.rss_mb, 1)
+        }
+
+    def _set_level(self, level: int):
+        previous = self.level
+        self.level = level
+        self._over = 0
+        self._under = 0
+
+        log = logger.warning if level > previous else logger.info
+        log(f"Resource governor: level {previous} -> {level} ({self.profile['name']}); "
+            f"agent CPU {self.cpu_percent:.1f}% (budget {self.cpu_budget}%), "
+            f"RSS {self.rss_mb:.0f} MB (budget {self.rss_budget_mb} MB)")
+
+        if self.on_change:
+            try:
+                self.on_change(level, self.profile)
+            except Exception as e:
+                logger.error(f"Error applying degradation level {level}: {e}")
@@ -0,0 +1,124 @@
+"""
+Rollup Lambda function for KeyGuard360 Dashboard
+Triggered by the logs table's DynamoDB stream: counts new logs per hour and
+per day (in total and by type) and per device per day into the rollups
+table, so /stats reads a handful of items however many logs there are.
+Stream delivery is at-least-once, so a retried batch is counted again.
+It also sets time_bucket on new logs that lack it (agents older than the
+time-bucket-index), so they still show up in the dashboard feed.
+"""
+
+import os
+import zlib
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+import boto3
+
+dynamodb = boto3.resource('dynamodb')
+table = dynamodb.Table('keyguard360-rollups')
+logs_table = dynamodb.Table('keyguard360-logs')
+
+# Rollup items expire (DynamoDB TTL on expires_at) this long after their period
+HOUR_RETENTION_DAYS = int(os.environ.get('ROLLUP_HOUR_RETENTION_DAYS', '14'))
+DAY_RETENTION_DAYS = int(os.environ.get('ROLLUP_DAY_RETENTION_DAYS', '400'))
+
+# Per-device day counters are spread over this many items (scope devices#<n>),
+# keeping each well under the 400 KB item limit; optimized_lambda reads the same count
+DEVICE_SHARDS = int(os.environ.get('ROLLUP_DEVICE_SHARDS', '16'))
+
+# Counters per update_item (keeps the UpdateExpression well under 4 KB)
+MAX_COUNTERS_PER_UPDATE = 100
+
+def aggregate(logs):
+    """
+    Sum logs (dicts with timestamp, type and device_id) into
+    {(scope, period): Counter(attribute -> increment)}:
+      ('hour', 'YYYY-MM-DDTHH') and ('day', 'YYYY-MM-DD'): events, type:<type>
+      ('devices#<n>', 'YYYY-MM-DD'):                      device:<device_id>
+    (n: device_shard of the device)
+    """
+    rollups = defaultdict(Counter)
+    for log in logs:
+        timestamp = log.get('timestamp')
+        if not timestamp:
+            continue
+        log_type = log.get('type') or 'unknown'
+        for scope, period in (('hour', timestamp[:13]), ('day', timestamp[:10])):
+            counters = rollups[(scope, period)]
+            counters['events'] += 1
+            counters[f'type:{log_type}'] += 1
+        device_id = log.get('device_id') or 'unknown'
+        rollups[(f'devices#{device_shard(device_id)}', timestamp[:10])][f'device:{device_id}'] += 1
+    return rollups
+
+def device_shard(device_id: str) -> int:
+    """Stable shard of a device (crc32, unlike hash(), is the same in every process)"""
+    return zlib.crc32(device_id.encode('utf-8')) % DEVICE_SHARDS
+
+def expires_at(scope: str, period: str) -> int:
+    days = HOUR_RETENTION_DAYS if scope == 'hour' else DAY_RETENTION_DAYS
+    start = datetime.strptime(period[:10], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    return int((start + timedelta(days=days + 1)).timestamp())
+
+def apply_rollups(table, rollups):
+    """Add aggregated counters to the rollups table (ADD creates missing items and attributes)"""
+    for (scope, period), counters in rollups.items():
+        counters = list(counters.items())
+        for start in range(0, len(counters), MAX_COUNTERS_PER_UPDATE):
+            names = {'#ttl': 'expires_at'}
+            values = {':ttl': expires_at(scope, period)}
+            adds = []
+            for i, (attribute, count) in enumerate(counters[start:start + MAX_COUNTERS_PER_UPDATE]):
+                names[f'#c{i}'] = attribute
+                values[f':c{i}'] = count
+                adds.append(f'#c{i} :c{i}')
+            table.update_item(
+                Key={'scope': scope, 'period': period},
+                UpdateExpression='ADD ' + ', '.join(adds) + ' SET #ttl = :ttl',
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values
+            )
+
+def new_logs(records):
+    """Plain fields of the logs inserted in a stream batch (updates, e.g. replays of a log_id, are not counted)"""
+    for record in records:
+        if record.get('eventName') != 'INSERT':
+            continue
+        image = record.get('dynamodb', {}).get('NewImage', {})
+        yield {
+            field: image[field]['S']
+            for field in ('log_id', 'timestamp', 'type', 'device_id', 'time_bucket')
+            if 'S' in image.get(field, {})
+        }
+
+def fill_time_buckets(logs_table, logs) -> int:
+    """Set time_bucket (the UTC day) on new logs written without it; returns how many were set"""
+    filled = 0
+    for log in logs:
+        if 'time_bucket' in log or not log.get('log_id') or not log.get('timestamp'):
+            continue
+        try:
+            logs_table.update_item(
+                Key={'log_id': log['log_id']},
+                UpdateExpression='SET time_bucket = :bucket',
+                # The MODIFY this causes is not rolled up again (see new_logs)
+                ConditionExpression='attribute_exists(log_id) AND attribute_not_exists(time_bucket)',
+                ExpressionAttributeValues={':bucket': log['timestamp'][:10]}
+            )
+            filled += 1
+        except logs_table.meta.client.exceptions.ConditionalCheckFailedException:
+            # Already set (a retried batch) or the log is gone
+            pass
+    return filled
+
+def lambda_handler(event, context):
+    """
+    Stream batch handler. Errors are raised so Lambda retries the batch
+    rather than dropping its counts.
+    """
+    logs = list(new_logs(event.get('Records', [])))
+    rollups = aggregate(logs)
+    apply_rollups(table, rollups)
+    filled = fill_time_buckets(logs_table, logs)
+    print(f"Rolled up {len(logs)} logs into {len(rollups)} items, set time_bucket on {filled}")
+    return {'logs': len(logs), 'rollups': len(rollups), 'time_buckets': filled}
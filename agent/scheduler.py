@@ -0,0 +1,147 @@
+"""
+KeyGuard360 Task Scheduler
+Priority-queue (heap) timer scheduler for the agent's periodic work.
+Intervals do not drift, each device runs its tasks at a deterministic
+phase derived from its device_id (so a fleet started at the same time
+does not hit AWS in lockstep), and stop() wakes the loop immediately.
+"""
+
+import hashlib
+import heapq
+import logging
+import threading
+import time
+
+logger = logging.getLogger('KeyGuard360')
+
+# What to do when a task is due more than one interval late
+# (laptop sleep, long-running task):
+#   skip     - run once now, then continue on the next slot of the original grid
+#   catch_up - run every missed slot back to back (at most max_catch_up)
+MISSED_RUN_POLICIES = ('skip', 'catch_up')
+
+
+def device_phase(seed: str, name: str, interval: float) -> float:
+    """Deterministic offset in [0, interval) for a device/task pair"""
+    digest = hashlib.sha256(f"{seed}:{name}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big') / 2**64 * interval
+
+
+class ScheduledTask:
+    """A periodic task tracked by the Scheduler"""
+
+    def __init__(self, name, interval, func, policy, max_catch_up):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.due = 0.0
+        self.runs = 0
+        self.skipped = 0
+
+
+class Scheduler:
+    """Runs periodic tasks on the calling thread until stop() is called"""
+
+    def __init__(self, seed: str = '', jitter=1.0):
+        """
+        seed:   per-device string (device_id) used to derive task phases
+        jitter: fraction of each interval used to spread phases across
+                the fleet (0 = every device runs on the same grid)
+        """
+        self.seed = seed
+        self.jitter = jitter
+        self._heap = []
+        self._tasks = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+    def add(self, name: str, interval: float, func, run_now=False, policy='skip', max_catch_up=3):
+        """Schedule func every interval seconds, on this device's phase of the wall-clock grid"""
+        if policy not in MISSED_RUN_POLICIES:
+            raise ValueError(f"Unknown missed-run policy: {policy}")
+
+        task = ScheduledTask(name, interval, func, policy, max_catch_up)
+        now = time.monotonic()
+        if run_now:
+            task.due = now
+        else:
+            # Align to slots of the wall clock so restarts keep the same phase
+            wall = time.time()
+            phase = device_phase(self.seed, name, interval) * self.jitter
+            next_slot = wall - (wall % interval) + phase
+            if next_slot <= wall:
+                next_slot += interval
+            task.due = now + (next_slot - wall)
+
+        with self._lock:
+            self._tasks[name] = task
+            self._push(task)
+        self._wakeup.set()
+        return task
+
+    def set_interval(self, name: str, interval: float):
+        """Change a task's interval; takes effect from its next run"""
+        with self._lock:
+            task = self._tasks.get(name)
+            if task is not None and task.interval != interval:
+                task.interval = interval
+                logger.info(f"Scheduled task {name} interval set to {interval:g}s")
+
+    def run(self):
+        """Run due tasks until stop(); sleeps exactly until the next due time"""
+        while not self._stopped:
+            with self._lock:
+                task = self._heap[0][2] if self._heap else None
+            delay = task.due - time.monotonic() if task else None
+
+            if delay is None or delay > 0:
+                self._wakeup.wait(delay)
+                self._wakeup.clear()
+                continue
+
+            with self._lock:
+                heapq.heappop(self._heap)
+            self._run_task(task)
+
+            with self._lock:
+                if not self._stopped:
+                    self._reschedule(task)
+
+    def stop(self):
+        """Stop the loop; wakes it immediately if it is sleeping"""
+        self._stopped = True
+        self._wakeup.set()
+
+    def _push(self, task):
+        self._seq += 1
+        heapq.heappush(self._heap, (task.due, self._seq, task))
+
+    def _run_task(self, task):
+        try:
+            task.func()
+        except Exception as e:
+            logger.error(f"Scheduled task {task.name} failed: {e}")
+        task.runs += 1
+
+    def _reschedule(self, task):
+        """Advance to the next slot on the task's grid (never drifts with task duration)"""
+        task.due += task.interval
+        now = time.monotonic()
+        if task.due > now:
+            self._push(task)
+            return
+
+        missed = int((now - task.due) // task.interval) + 1
+        if task.policy == 'catch_up' and missed <= task.max_catch_up:
+            # Leave task.due in the past; the loop runs it again right away
+            self._push(task)
+            return
+
+        task.due += missed * task.interval
+        task.skipped += missed
+        logger.info(f"Scheduled task {task.name} skipped {missed} missed runs")
+        self._push(task)
@@ -0,0 +1,91 @@
+"""
+KeyGuard360 Screen Frame Utilities
+Exact frame digests used to detect unchanged screenshots, and
+tile-based delta encoding (keyframe + changed tiles) with the matching
+reconstruction used by export_data.py.
+"""
+
+import hashlib
+import math
+from io import BytesIO
+
+from PIL import Image
+
+
+def frame_digest(image: Image.Image) -> str:
+    """
+    Exact content hash of a raw (not yet encoded) frame. Perceptual hashes
+    are blind to a new line of text on a large screen, so a frame only
+    counts as unchanged when every pixel is the same.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{image.mode}:{image.size}".encode('ascii'))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def tile_grid(width: int, height: int, tile_size: int):
+    """Number of tile columns and rows covering a frame"""
+    return -(-width // tile_size), -(-height // tile_size)
+
+
+def tile_box(index: int, width: int, height: int, tile_size: int):
+    """Pixel box of a tile, clipped to the frame edges"""
+    columns, _ = tile_grid(width, height, tile_size)
+    left = (index % columns) * tile_size
+    top = (index // columns) * tile_size
+    return left, top, min(left + tile_size, width), min(top + tile_size, height)
+
+
+def tile_hashes(image: Image.Image, tile_size: int) -> list:
+    """Exact content hash of every tile, in row-major order"""
+    width, height = image.size
+    columns, rows = tile_grid(width, height, tile_size)
+    return [
+        hashlib.blake2b(image.crop(tile_box(i, width, height, tile_size)).tobytes(), digest_size=8).hexdigest()
+        for i in range(columns * rows)
+    ]
+
+
+def pack_tiles(image: Image.Image, indices: list, tile_size: int):
+    """
+    Copy the given tiles into a compact atlas image.
+    Returns (atlas, atlas_columns); tile n of the list sits in atlas slot n.
+    """
+    width, height = image.size
+    atlas_columns = max(1, math.ceil(math.sqrt(len(indices))))
+    atlas_rows = max(1, -(-len(indices) // atlas_columns))
+    atlas = Image.new(image.mode, (atlas_columns * tile_size, atlas_rows * tile_size))
+
+    for slot, index in enumerate(indices):
+        tile = image.crop(tile_box(index, width, height, tile_size))
+        atlas.paste(tile, ((slot % atlas_columns) * tile_size, (slot // atlas_columns) * tile_size))
+    return atlas, atlas_columns
+
+
+def apply_delta(keyframe: Image.Image, atlas: Image.Image, manifest: dict) -> Image.Image:
+    """Rebuild a frame by pasting the atlas tiles of a delta over its keyframe"""
+    tile_size = manifest['tile_size']
+    atlas_columns = manifest['atlas_columns']
+    width, height = keyframe.size
+    if [width, height] != list(manifest['frame_size']):
+        raise ValueError(f"Keyframe is {width}x{height}, delta expects {manifest['frame_size']}")
+
+    frame = keyframe.copy()
+    if atlas.mode != frame.mode:
+        atlas = atlas.convert(frame.mode)
+
+    for slot, index in enumerate(manifest['tiles']):
+        left, top, right, bottom = tile_box(index, width, height, tile_size)
+        atlas_left = (slot % atlas_columns) * tile_size
+        atlas_top = (slot // atlas_columns) * tile_size
+        tile = atlas.crop((atlas_left, atlas_top, atlas_left + right - left, atlas_top + bottom - top))
+        frame.paste(tile, (left, top))
+    return frame
+
+
+def reconstruct_frame(keyframe_bytes: bytes, delta_bytes: bytes, manifest: dict) -> Image.Image:
+    """Decode an uploaded keyframe and delta atlas and rebuild the captured frame"""
+    keyframe = Image.open(BytesIO(keyframe_bytes))
+    atlas = Image.open(BytesIO(delta_bytes))
+    return apply_delta(keyframe, atlas, manifest)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Create the GSIs the dashboard Lambda and the exporter read logs from
+(time-bucket-index for the newest-first feed, device-time-index for one
+device's logs), and backfill time_bucket on logs written before the agent
+set it. Safe to run again: indexes are only created once and only items
+without a time_bucket are updated.
+"""
+import time
+
+from config import config
+from aws_clients import AwsClientFactory
+
+# Index name -> partition key (all are sorted by timestamp)
+INDEXES = {
+    'time-bucket-index': 'time_bucket',
+    'device-time-index': 'device_id'
+}
+
+def create_index(client, table_name, index_name, partition_key):
+    """Add a GSI (partition_key HASH, timestamp RANGE) and wait until it is active"""
+    description = client.describe_table(TableName=table_name)['Table']
+    indexes = {index['IndexName']: index for index in description.get('GlobalSecondaryIndexes', [])}
+
+    # DynamoDB builds one new index per table at a time, so each is created
+    # and awaited before the next
+    if index_name not in indexes:
+        print(f"🔧 Creating {index_name} on {table_name}...")
+        index = {
+            'Create': {
+                'IndexName': index_name,
+                'KeySchema': [
+                    {'AttributeName': partition_key, 'KeyType': 'HASH'},
+                    {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
+            }
+        }
+        if description.get('BillingModeSummary', {}).get('BillingMode') != 'PAY_PER_REQUEST':
+            index['Create']['ProvisionedThroughput'] = {
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        client.update_table(
+            TableName=table_name,
+            AttributeDefinitions=[
+                {'AttributeName': partition_key, 'AttributeType': 'S'},
+                {'AttributeName': 'timestamp', 'AttributeType': 'S'}
+            ],
+            GlobalSecondaryIndexUpdates=[index]
+        )
+
+    while True:
+        description = client.describe_table(TableName=table_name)['Table']
+        status = next(index['IndexStatus'] for index in description['GlobalSecondaryIndexes']
+                      if index['IndexName'] == index_name)
+        if status == 'ACTIVE':
+            print(f"✅ {index_name} is active")
+            return
+        print(f"   ⏳ {index_name} is {status}...")
+        time.sleep(15)
+
+def backfill(table):
+    """Set time_bucket (the UTC day of the timestamp) on existing logs"""
+    print("🗂️  Backfilling time_bucket on existing logs...")
+    kwargs = {
+        'ProjectionExpression': 'log_id, #ts, time_bucket',
+        'ExpressionAttributeNames': {'#ts': 'timestamp'}
+    }
+    scanned = updated = 0
+    while True:
+        response = table.scan(**kwargs)
+        for item in response.get('Items', []):
+            scanned += 1
+            if 'time_bucket' in item or not item.get('timestamp'):
+                continue
+            table.update_item(
+                Key={'log_id': item['log_id']},
+                UpdateExpression='SET time_bucket = :bucket',
+                ExpressionAttributeValues={':bucket': item['timestamp'][:10]}
+            )
+            updated += 1
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        print(f"   {scanned} scanned, {updated} updated")
+
+    print(f"✅ Backfill done: {scanned} logs scanned, {updated} updated")
+
+def setup_log_index():
+    aws = AwsClientFactory(config)
+    try:
+        for index_name, partition_key in INDEXES.items():
+            create_index(aws.client('dynamodb'), config.DYNAMODB_LOGS_TABLE, index_name, partition_key)
+        backfill(aws.table(config.DYNAMODB_LOGS_TABLE))
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        print("\nTip: Ensure your IAM user has 'dynamodb:UpdateTable', 'dynamodb:Scan' and 'dynamodb:UpdateItem' permissions.")
+
+if __name__ == '__main__':
+    setup_log_index()
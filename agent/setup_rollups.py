@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Set up the rollups behind the dashboard's /stats endpoint: the rollups
+table (with TTL), the logs table stream, and optionally the stream trigger
+of the deployed rollup Lambda and a backfill of the logs written so far.
+
+    python setup_rollups.py [--function keyguard360-rollups] [--backfill]
+
+Backfill before attaching the trigger (or with the trigger disabled),
+otherwise logs written in between are counted twice.
+"""
+import argparse
+import os
+import time
+
+from config import config
+from aws_clients import AwsClientFactory
+
+ROLLUPS_TABLE = 'keyguard360-rollups'
+
+def create_rollups_table(client):
+    """scope (hour/day/devices) HASH + period RANGE, expiring on expires_at"""
+    try:
+        client.describe_table(TableName=ROLLUPS_TABLE)
+        print(f"✅ {ROLLUPS_TABLE} already exists")
+    except client.exceptions.ResourceNotFoundException:
+        print(f"🔧 Creating {ROLLUPS_TABLE}...")
+        client.create_table(
+            TableName=ROLLUPS_TABLE,
+            AttributeDefinitions=[
+                {'AttributeName': 'scope', 'AttributeType': 'S'},
+                {'AttributeName': 'period', 'AttributeType': 'S'}
+            ],
+            KeySchema=[
+                {'AttributeName': 'scope', 'KeyType': 'HASH'},
+                {'AttributeName': 'period', 'KeyType': 'RANGE'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        client.get_waiter('table_exists').wait(TableName=ROLLUPS_TABLE)
+        print(f"✅ {ROLLUPS_TABLE} created")
+
+    ttl = client.describe_time_to_live(TableName=ROLLUPS_TABLE)['TimeToLiveDescription']
+    if ttl.get('TimeToLiveStatus') not in ('ENABLED', 'ENABLING'):
+        client.update_time_to_live(
+            TableName=ROLLUPS_TABLE,
+            TimeToLiveSpecification={'Enabled': True, 'AttributeName': 'expires_at'}
+        )
+        print("✅ TTL enabled on expires_at")
+
+def enable_logs_stream(client) -> str:
+    """Turn on the logs table stream (new images only); returns its ARN"""
+    table = client.describe_table(TableName=config.DYNAMODB_LOGS_TABLE)['Table']
+    if not table.get('StreamSpecification', {}).get('StreamEnabled'):
+        print(f"🔧 Enabling the stream on {config.DYNAMODB_LOGS_TABLE}...")
+        client.update_table(
+            TableName=config.DYNAMODB_LOGS_TABLE,
+            StreamSpecification={'StreamEnabled': True, 'StreamViewType': 'NEW_IMAGE'}
+        )
+        while 'LatestStreamArn' not in table or table.get('TableStatus') != 'ACTIVE':
+            time.sleep(5)
+            table = client.describe_table(TableName=config.DYNAMODB_LOGS_TABLE)['Table']
+    print(f"✅ Logs stream: {table['LatestStreamArn']}")
+    return table['LatestStreamArn']
+
+def attach_trigger(lambda_client, function_name: str, stream_arn: str):
+    """Event source mapping from the logs stream to the rollup Lambda"""
+    mappings = lambda_client.list_event_source_mappings(
+        EventSourceArn=stream_arn, FunctionName=function_name)['EventSourceMappings']
+    if mappings:
+        print(f"✅ {function_name} is already triggered by the logs stream")
+        return
+    lambda_client.create_event_source_mapping(
+        EventSourceArn=stream_arn,
+        FunctionName=function_name,
+        StartingPosition='LATEST',
+        BatchSize=100,
+        MaximumBatchingWindowInSeconds=5
+    )
+    print(f"✅ {function_name} now rolls up new logs")
+
+def backfill(aws):
+    """Roll up every log already in the table, a scan page at a time"""
+    # rollup_lambda creates a default-region resource on import
+    os.environ.setdefault('AWS_DEFAULT_REGION', config.AWS_REGION)
+    from rollup_lambda import aggregate, apply_rollups
+
+    print("🗂️  Rolling up existing logs...")
+    logs_table = aws.table(config.DYNAMODB_LOGS_TABLE)
+    rollups_table = aws.table(ROLLUPS_TABLE)
+    kwargs = {
+        'ProjectionExpression': '#ts, #tp, device_id',
+        'ExpressionAttributeNames': {'#ts': 'timestamp', '#tp': 'type'}
+    }
+    total = 0
+    while True:
+        response = logs_table.scan(**kwargs)
+        logs = response.get('Items', [])
+        apply_rollups(rollups_table, aggregate(logs))
+        total += len(logs)
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        print(f"   {total} logs rolled up")
+
+    print(f"✅ Backfill done: {total} logs rolled up")
+
+def setup_rollups(function_name=None, run_backfill=False):
+    aws = AwsClientFactory(config)
+    try:
+        client = aws.client('dynamodb')
+        create_rollups_table(client)
+        stream_arn = enable_logs_stream(client)
+        if run_backfill:
+            backfill(aws)
+        if function_name:
+            attach_trigger(aws.client('lambda'), function_name, stream_arn)
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        print("\nTip: Ensure your IAM user has DynamoDB table/stream and 'lambda:CreateEventSourceMapping' permissions.")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Set up the /stats rollups')
+    parser.add_argument('--function', help='Name of the deployed rollup_lambda function to trigger from the logs stream')
+    parser.add_argument('--backfill', action='store_true', help='Roll up the logs already in the table')
+    args = parser.parse_args()
+    setup_rollups(args.function, args.backfill)
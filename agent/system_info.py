@@ -0,0 +1,131 @@
+"""
+KeyGuard360 System Information Collector
+Splits device facts by how often they change:
+  - static facts (hostname, OS, processor...) are read once
+  - network facts (public IP, location, internal IP) are cached with a TTL
+    and refreshed on a background thread
+  - fast metrics (CPU, memory, disk) are sampled without blocking
+"""
+
+import getpass
+import json
+import logging
+import platform
+import socket
+import threading
+import time
+from datetime import datetime, UTC
+
+import psutil
+
+logger = logging.getLogger('KeyGuard360')
+
+
+def fetch_public_ip():
+    """Get the actual public IP address of the device"""
+    # urllib.request pulls in ssl/http; only the background refresh needs it
+    import urllib.request
+    try:
+        return urllib.request.urlopen('https://api.ipify.org', timeout=5).read().decode('utf8')
+    except Exception:
+        return None
+
+
+def fetch_location():
+    """Get geographical location based on public IP"""
+    import urllib.request
+    try:
+        # Using a free, no-key-required geolocation API
+        with urllib.request.urlopen('http://ip-api.com/json/', timeout=5) as response:
+            data = json.loads(response.read().decode())
+            if data.get('status') == 'success':
+                city = data.get('city', 'Unknown City')
+                region = data.get('regionName', '')
+                country = data.get('country', 'Unknown Country')
+                return f"{city}, {country}" if not region else f"{city} ({region}), {country}"
+    except Exception:
+        pass
+    return "Remote Entry"
+
+
+def fetch_internal_ip():
+    """Get the LAN address of the default route interface"""
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.connect(("8.8.8.8", 80))
+        internal_ip = s.getsockname()[0]
+        s.close()
+        return internal_ip
+    except Exception:
+        return "127.0.0.1"
+
+
+class SystemInfoCollector:
+    """Cheap, non-blocking source for the device status heartbeat"""
+
+    def __init__(self, device_id: str, network_ttl=3600):
+        self.device_id = device_id
+        self.network_ttl = network_ttl
+
+        memory_total = psutil.virtual_memory().total
+        self.static = {
+            'device_id': device_id,
+            'hostname': platform.node(),
+            'user': getpass.getuser(),
+            'os': f"{platform.system()} {platform.release()}",
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'memory_total_gb': round(memory_total / (1024**3), 2)
+        }
+
+        self._network = {
+            'public_ip': None,
+            'internal_ip': "127.0.0.1",
+            'location': "Remote Entry"
+        }
+        self._network_updated = None
+        self._refreshing = threading.Lock()
+
+        # Prime the CPU counter: cpu_percent(interval=None) reports usage since the previous call
+        psutil.cpu_percent(interval=None)
+        self.refresh_network()
+
+    def refresh_network(self):
+        """Re-resolve public IP and location in the background (no-op if already running)"""
+        if not self._refreshing.acquire(blocking=False):
+            return
+        threading.Thread(target=self._refresh_network, name='network-info', daemon=True).start()
+
+    def _refresh_network(self):
+        try:
+            self._network = {
+                'public_ip': fetch_public_ip(),
+                'internal_ip': fetch_internal_ip(),
+                'location': fetch_location()
+            }
+            self._network_updated = time.monotonic()
+        except Exception as e:
+            logger.error(f"Error refreshing network info: {e}")
+        finally:
+            self._refreshing.release()
+
+    def collect(self) -> dict:
+        """Return the full system info dict; never waits on the network"""
+        if self._network_updated is None or time.monotonic() - self._network_updated >= self.network_ttl:
+            self.refresh_network()
+
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        network = self._network
+
+        return {
+            **self.static,
+            'ip_address': network['public_ip'] or network['internal_ip'],
+            'internal_ip': network['internal_ip'],
+            'location': network['location'],
+            'cpu_usage': psutil.cpu_percent(interval=None),
+            'memory_used_gb': round(memory.used / (1024**3), 2),
+            'memory_percent': memory.percent,
+            'disk_percent': disk.percent,
+            'timestamp': datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+        }
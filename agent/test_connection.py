@@ -4,14 +4,15 @@ Test AWS Connection
 Quick script to verify AWS credentials and resources are configured correctly
 """
 
-import boto3
 from config import Config
+from aws_clients import AwsClientFactory
 import sys
 
 
 def test_aws_connection():
     """Test AWS connection and resources"""
     config = Config()
+    aws = AwsClientFactory(config)
     
     print("=" * 60)
     print("KeyGuard360 AWS Connection Test")
@@ -29,12 +30,7 @@ def test_aws_connection():
     # Test AWS credentials
     print("2️⃣  Testing AWS credentials...")
     try:
-        sts = boto3.client(
-            'sts',
-            aws_access_key_id=config.AWS_ACCESS_KEY,
-            aws_secret_access_key=config.AWS_SECRET_KEY,
-            region_name=config.AWS_REGION
-        )
+        sts = aws.client('sts')
         identity = sts.get_caller_identity()
         print(f"✅ AWS credentials valid")
         print(f"   Account: {identity['Account']}")
@@ -47,12 +43,7 @@ def test_aws_connection():
     # Test S3 bucket
     print("3️⃣  Testing S3 bucket...")
     try:
-        s3 = boto3.client(
-            's3',
-            aws_access_key_id=config.AWS_ACCESS_KEY,
-            aws_secret_access_key=config.AWS_SECRET_KEY,
-            region_name=config.AWS_REGION
-        )
+        s3 = aws.client('s3')
         s3.head_bucket(Bucket=config.S3_BUCKET)
         print(f"✅ S3 bucket '{config.S3_BUCKET}' exists and is accessible")
     except Exception as e:
@@ -64,12 +55,7 @@ def test_aws_connection():
     # Test DynamoDB tables
     print("4️⃣  Testing DynamoDB tables...")
     try:
-        dynamodb = boto3.client(
-            'dynamodb',
-            aws_access_key_id=config.AWS_ACCESS_KEY,
-            aws_secret_access_key=config.AWS_SECRET_KEY,
-            region_name=config.AWS_REGION
-        )
+        dynamodb = aws.client('dynamodb')
         
         # Test logs table
         dynamodb.describe_table(TableName=config.DYNAMODB_LOGS_TABLE)
@@ -87,12 +73,7 @@ def test_aws_connection():
     # Test SNS topic (optional)
     print("5️⃣  Testing SNS topic (optional)...")
     try:
-        sns = boto3.client(
-            'sns',
-            aws_access_key_id=config.AWS_ACCESS_KEY,
-            aws_secret_access_key=config.AWS_SECRET_KEY,
-            region_name=config.AWS_REGION
-        )
+        sns = aws.client('sns')
         sns.get_topic_attributes(TopicArn=config.SNS_TOPIC_ARN)
         print(f"✅ SNS topic exists")
     except Exception as e:
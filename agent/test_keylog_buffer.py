@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Keylog Buffer Stress Test
+Hammers KeystrokeDoubleBuffer with concurrent appends and concurrent
+flushes, then checks that every keystroke was flushed exactly once.
+Runs offline - no AWS access or config.py needed.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+
+from keylog_codec import KeystrokeDoubleBuffer, encode_batch, decode_batch
+
+
+def stress_keylog_buffer(producers=4, keys_per_producer=50000, flushers=3, capacity=100):
+    """Run producers and flushers concurrently; returns True if nothing was lost or duplicated"""
+    buffer = KeystrokeDoubleBuffer(capacity)
+    flushed = []
+    batches = []
+    flushed_lock = threading.Lock()
+    producers_done = threading.Event()
+
+    def produce(producer_id):
+        for seq in range(keys_per_producer):
+            buffer.append(f"p{producer_id}-{seq}")
+
+    def flush():
+        # Same path as the agent: drain, encode, decode as the dashboard would
+        while True:
+            finished = producers_done.is_set()
+            batch = buffer.drain()
+            if batch is not None:
+                keys = [event['key'] for event in decode_batch(encode_batch(batch))]
+                with flushed_lock:
+                    flushed.extend(keys)
+                    batches.append(keys)
+            elif finished:
+                return
+            else:
+                time.sleep(0.0005)
+
+    producer_threads = [threading.Thread(target=produce, args=(i,)) for i in range(producers)]
+    flusher_threads = [threading.Thread(target=flush) for _ in range(flushers)]
+
+    started = time.perf_counter()
+    for thread in flusher_threads + producer_threads:
+        thread.start()
+    for thread in producer_threads:
+        thread.join()
+    producers_done.set()
+    for thread in flusher_threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    expected = {f"p{p}-{s}" for p in range(producers) for s in range(keys_per_producer)}
+    counts = Counter(flushed)
+    lost = expected - counts.keys()
+    duplicated = [key for key, count in counts.items() if count > 1]
+
+    total = producers * keys_per_producer
+    print(f"   {total} keys from {producers} producers, {flushers} concurrent flushers, {elapsed:.2f}s")
+    print(f"   flushed: {len(flushed)}, lost: {len(lost)}, duplicated: {len(duplicated)}")
+
+    # Within a batch, keys from one producer must keep their order
+    in_order = True
+    for keys in batches:
+        last_seq = {}
+        for key in keys:
+            producer_id, seq = key[1:].split('-')
+            if int(seq) < last_seq.get(producer_id, -1):
+                in_order = False
+            last_seq[producer_id] = int(seq)
+    if not in_order:
+        print("   keys reordered inside a batch")
+
+    return not lost and not duplicated and len(flushed) == total and in_order
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("KeyGuard360 Keylog Buffer Stress Test")
+    print("=" * 60)
+    success = stress_keylog_buffer()
+    print("✅ No keystrokes lost or duplicated" if success else "❌ Keylog buffer stress test failed")
+    sys.exit(0 if success else 1)
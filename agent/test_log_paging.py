@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Dashboard Feed Paging Check
+Pages through optimized_lambda's newest-first feed over an in-memory logs
+table (a stand-in for time-bucket-index that evaluates the boto3 key
+conditions the Lambda builds) and checks that every log comes back once,
+in order, that following X-Next-Cursor past the oldest log ends, and that
+a ?since= poll still returns a log that arrived after a newer-stamped one.
+Runs offline - needs boto3 installed, but no AWS access or config.py.
+"""
+
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+import optimized_lambda
+
+# Requests after which a cursor loop counts as never ending
+MAX_REQUESTS = 50
+
+
+def key_conditions(condition):
+    """(attribute, operator, values) of a boto3 key condition, ANDs flattened"""
+    expression = condition.get_expression()
+    if expression['operator'] == 'AND':
+        for part in expression['values']:
+            yield from key_conditions(part)
+    else:
+        key, *values = expression['values']
+        yield key.name, expression['operator'], values
+
+
+class FakeLogsTable:
+    """Answers time-bucket-index queries (newest first) from a list of logs"""
+
+    def __init__(self, logs):
+        self.logs = logs
+        self.queries = 0
+
+    def query(self, KeyConditionExpression, Limit, ExclusiveStartKey=None, **kwargs):
+        self.queries += 1
+        matches = self.logs
+        for name, operator, values in key_conditions(KeyConditionExpression):
+            if operator == '=':
+                matches = [log for log in matches if log[name] == values[0]]
+            elif operator == '>=':
+                matches = [log for log in matches if log[name] >= values[0]]
+            else:
+                raise AssertionError(f"Unexpected key condition {operator}")
+        matches = sorted(matches, key=lambda log: (log['timestamp'], log['log_id']), reverse=True)
+        if ExclusiveStartKey:
+            position = next(i for i, log in enumerate(matches) if log['log_id'] == ExclusiveStartKey['log_id'])
+            matches = matches[position + 1:]
+
+        page = matches[:Limit]
+        response = {'Items': [dict(log) for log in page]}
+        if len(page) == Limit:
+            last = page[-1]
+            response['LastEvaluatedKey'] = {
+                'log_id': last['log_id'], 'time_bucket': last['time_bucket'], 'timestamp': last['timestamp']}
+        return response
+
+
+def make_logs(days_ago):
+    """Three logs on each of the given days before today"""
+    now = datetime.now(timezone.utc)
+    logs = []
+    for days in days_ago:
+        for minute in range(3):
+            timestamp = (now - timedelta(days=days, minutes=minute)).isoformat()
+            logs.append({'log_id': f"device-check_{days}_{minute}", 'device_id': 'device-check',
+                         'timestamp': timestamp, 'time_bucket': timestamp[:10], 'type': 'keylog'})
+    return logs
+
+
+def page_through(logs, limit=2):
+    """Follow cursors from the newest page; returns (log ids in order, requests, queries) or None if it never ends"""
+    table = optimized_lambda.table = FakeLogsTable(logs)
+    seen = []
+    params = {'limit': str(limit)}
+    for requests in range(1, MAX_REQUESTS + 1):
+        response = optimized_lambda.lambda_handler({'queryStringParameters': params, 'headers': {}}, None)
+        assert response['statusCode'] == 200, response
+        seen.extend(item['log_id'] for item in json.loads(response['body']))
+        cursor = response['headers'].get('X-Next-Cursor')
+        if not cursor:
+            return seen, requests, table.queries
+        params = {'limit': str(limit), 'cursor': cursor}
+    return None
+
+
+def check(name, logs, expect_found=True):
+    """Page through logs; they must all come back in order (or, past the empty-day limit, none)"""
+    result = page_through(logs)
+    if result is None:
+        print(f"   {name}: still returning cursors after {MAX_REQUESTS} requests")
+        return False
+    seen, requests, queries = result
+    expected = [log['log_id'] for log in sorted(logs, key=lambda log: (log['timestamp'], log['log_id']), reverse=True)]
+    print(f"   {name}: {len(seen)}/{len(expected)} logs in {requests} requests, {queries} queries")
+    return seen == (expected if expect_found else [])
+
+
+def check_late_arrival():
+    """A log written after a poll but stamped 3s before its newest log must show up in the next ?since= poll"""
+    logs = make_logs([0])
+    optimized_lambda.table = FakeLogsTable(logs)
+    first = optimized_lambda.lambda_handler({'queryStringParameters': {}, 'headers': {}}, None)
+    token = first['headers']['X-Sync-Token']
+
+    newest = max(datetime.fromisoformat(log['timestamp']) for log in logs)
+    stamped = (newest - timedelta(seconds=3)).isoformat()
+    logs.append({'log_id': 'device-late_0', 'device_id': 'device-late', 'timestamp': stamped,
+                 'time_bucket': stamped[:10], 'type': 'keylog'})
+
+    second = optimized_lambda.lambda_handler({'queryStringParameters': {'since': token}, 'headers': {}}, None)
+    returned = [item['log_id'] for item in json.loads(second['body'])]
+    print(f"   late arrival: since-poll returned {len(returned)} logs, late log included: {'device-late_0' in returned}")
+    return 'device-late_0' in returned
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("KeyGuard360 Dashboard Feed Paging Check")
+    print("=" * 60)
+    success = all([
+        check("empty table", []),
+        check("logs today only", make_logs([0])),
+        check("gaps between days", make_logs([0, 2, 20])),
+        # More than LOG_MAX_EMPTY_DAYS empty days in a row: paging ends before reaching it
+        check("oldest log 45 days ago", make_logs([45]), expect_found=False),
+        check_late_arrival()
+    ])
+    print("✅ Paging returns every log and ends past the oldest" if success else "❌ Feed paging check failed")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Process Event Logging Check
+Runs ProcessMonitor scans over a simulated process table in which several
+watched processes start and stop at once, logs every event the way the
+agent does (new_log_id + BatchWriter), and checks that N events produce
+N DynamoDB items even when they share a millisecond.
+Runs offline - no AWS access or config.py needed.
+"""
+
+import sys
+from datetime import datetime, UTC
+
+import process_monitor
+from dynamo_batch import BatchWriter, new_log_id
+from process_monitor import ProcessMonitor
+
+LOGS_TABLE = 'keyguard360-logs'
+
+
+class FakeProcess:
+    """Stands in for psutil.Process: only name() is used by the monitor"""
+    names = {}
+
+    def __init__(self, pid):
+        self.pid = pid
+
+    def name(self):
+        return self.names[self.pid]
+
+
+class FakeDynamoDB:
+    """Collects what batch_write_item would have written"""
+
+    def __init__(self):
+        self.written = []
+
+    def batch_write_item(self, RequestItems):
+        for requests in RequestItems.values():
+            self.written.extend(request['PutRequest']['Item'] for request in requests)
+        return {}
+
+
+def check_process_events(watched=5):
+    """Start then stop `watched` matching processes; returns True if every event became an item"""
+    running = {pid: f"tor-{pid}.exe" for pid in range(100, 100 + watched)}
+    running.update({pid: f"notepad-{pid}.exe" for pid in range(200, 210)})
+    FakeProcess.names = running
+    process_monitor.psutil.pids = lambda: list(running)
+    process_monitor.psutil.Process = FakeProcess
+
+    dynamodb = FakeDynamoDB()
+    writer = BatchWriter(dynamodb, {LOGS_TABLE: ('log_id',)})
+
+    def log_event(event, info):
+        # Same item shape as KeyGuardAgent._log_activity
+        writer.put(LOGS_TABLE, {
+            'log_id': new_log_id('device-check'),
+            'device_id': 'device-check',
+            'timestamp': datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z',
+            'type': event,
+            'data': str(info)
+        })
+
+    monitor = ProcessMonitor(suspicious=['tor'], blocked=[], on_event=log_event)
+    events = monitor.scan()
+    for pid in range(100, 100 + watched):
+        del running[pid]
+    events += monitor.scan()
+    writer.flush()
+
+    ids = {item['log_id'] for item in dynamodb.written}
+    print(f"   {len(events)} process events, {len(dynamodb.written)} items written, "
+          f"{len(ids)} distinct log ids, {writer.stats['key_collisions']} key collisions")
+    return len(events) == 2 * watched and len(dynamodb.written) == len(events) == len(ids)
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("KeyGuard360 Process Event Logging Check")
+    print("=" * 60)
+    success = check_process_events()
+    print("✅ Every process event was written" if success else "❌ Process events were lost")
+    sys.exit(0 if success else 1)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Unchanged Screenshot Check
+Builds 1080p and 4K frames, adds a single new line of text (and a single
+pixel) to each, and checks that the agent's unchanged-screen test
+(frame_digest) never treats them as unchanged, while an identical grab is.
+Runs offline - needs Pillow, but no AWS access or config.py.
+"""
+
+import sys
+
+from PIL import Image, ImageDraw
+
+from screen_frames import frame_digest
+
+# One new 68-character line, as typed into a terminal or chat window
+TEXT_LINE = "Copying customer_records_2026.xlsx to personal-drive/backup ... done"
+
+
+def desktop(size):
+    """A plain window-like frame with a few lines of text already on it"""
+    frame = Image.new('RGB', size, (245, 245, 245))
+    draw = ImageDraw.Draw(frame)
+    draw.rectangle((40, 40, size[0] - 40, 80), fill=(30, 60, 120))
+    for row in range(5):
+        draw.text((60, 120 + row * 20), f"Existing line {row} of the document", fill=(20, 20, 20))
+    return frame
+
+
+def check_frame(name, size):
+    """Returns True if small changes are kept and an identical frame is skipped"""
+    before = desktop(size)
+    identical = before.copy()
+
+    with_text = before.copy()
+    ImageDraw.Draw(with_text).text((60, 240), TEXT_LINE, fill=(20, 20, 20))
+
+    with_pixel = before.copy()
+    with_pixel.putpixel((size[0] // 2, size[1] // 2), (0, 0, 0))
+
+    last = frame_digest(before)
+    results = {
+        'identical frame skipped': frame_digest(identical) == last,
+        'new text line kept': frame_digest(with_text) != last,
+        'single pixel kept': frame_digest(with_pixel) != last
+    }
+    for label, ok in results.items():
+        print(f"   {name} {label}: {'yes' if ok else 'NO'}")
+    return all(results.values())
+
+
+if __name__ == '__main__':
+    print("=" * 60)
+    print("KeyGuard360 Unchanged Screenshot Check")
+    print("=" * 60)
+    success = all([
+        check_frame("1080p", (1920, 1080)),
+        check_frame("4K", (3840, 2160))
+    ])
+    print("✅ Only identical screens are skipped" if success else "❌ Changed screens would be skipped")
+    sys.exit(0 if success else 1)
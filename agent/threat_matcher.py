@@ -0,0 +1,115 @@
+"""
+KeyGuard360 Threat Keyword Matcher
+Streaming Aho-Corasick matcher for THREAT_KEYWORDS, fed one keystroke at
+a time. The automaton is compiled into a full transition table, so each
+key costs one dict lookup no matter how many keywords are configured.
+Backspace is undone from a short state history (no longer than the
+longest keyword) rather than by re-scanning.
+"""
+
+from collections import Counter, deque
+
+from keylog_codec import SYMBOL_BASE
+
+BACKSPACE = '\b'
+SEPARATOR = '\n'
+
+# pynput names of keys that do not move the cursor or change the text
+IGNORED_KEYS = frozenset({
+    'Key.shift', 'Key.shift_l', 'Key.shift_r',
+    'Key.ctrl', 'Key.ctrl_l', 'Key.ctrl_r',
+    'Key.alt', 'Key.alt_l', 'Key.alt_r', 'Key.alt_gr',
+    'Key.cmd', 'Key.cmd_l', 'Key.cmd_r',
+    'Key.caps_lock'
+})
+
+
+def build_automaton(keywords):
+    """
+    Compile keywords into (transitions, outputs): transitions[state] maps a
+    character to the next state (missing characters go back to state 0),
+    outputs[state] lists the keywords that end at that state.
+    """
+    goto = [{}]
+    outputs = [()]
+    for keyword in keywords:
+        state = 0
+        for char in keyword:
+            next_state = goto[state].get(char)
+            if next_state is None:
+                goto.append({})
+                outputs.append(())
+                next_state = goto[state][char] = len(goto) - 1
+            state = next_state
+        outputs[state] += (keyword,)
+
+    # Breadth-first: every state's failure target is shallower, so its
+    # transition row is complete by the time the state is reached
+    fail = [0] * len(goto)
+    transitions = [None] * len(goto)
+    transitions[0] = dict(goto[0])
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        row = dict(transitions[fail[state]])
+        row.update(goto[state])
+        transitions[state] = row
+        outputs[state] += outputs[fail[state]]
+        for char, child in goto[state].items():
+            fail[child] = transitions[fail[state]].get(char, 0) if state else 0
+            queue.append(child)
+
+    return transitions, outputs
+
+
+class KeywordMatcher:
+    """Stateful matcher; feed() keys in typing order"""
+
+    def __init__(self, keywords):
+        self.keywords = sorted({keyword.lower() for keyword in keywords if keyword})
+        self._transitions, self._outputs = build_automaton(self.keywords)
+        self._state = 0
+        self._history = deque(maxlen=max(map(len, self.keywords), default=1))
+
+    @property
+    def states(self) -> int:
+        return len(self._transitions)
+
+    def reset(self):
+        self._state = 0
+        self._history.clear()
+
+    def feed(self, key: str) -> tuple:
+        """Advance by one key (a character or a pynput name like 'Key.space'); returns keywords ending here"""
+        char = self._normalize(key)
+        if char is None:
+            return ()
+        if char == BACKSPACE:
+            self._state = self._history.pop() if self._history else 0
+            return ()
+        self._history.append(self._state)
+        self._state = self._transitions[self._state].get(char, 0)
+        return self._outputs[self._state]
+
+    def feed_batch(self, batch: dict) -> Counter:
+        """Feed a drained KeystrokeBuffer batch; returns keyword -> match count"""
+        matches = Counter()
+        symbols = batch['symbols']
+        for code in batch['codes']:
+            key = symbols[code - SYMBOL_BASE] if code >= SYMBOL_BASE else chr(code)
+            for keyword in self.feed(key):
+                matches[keyword] += 1
+        return matches
+
+    @staticmethod
+    def _normalize(key: str):
+        if len(key) == 1:
+            return key.lower()
+        if key == 'Key.space':
+            return ' '
+        if key == 'Key.backspace':
+            return BACKSPACE
+        if key in IGNORED_KEYS:
+            return None
+        # Enter, tab, arrows, clicks to other fields... end the current word
+        return SEPARATOR
@@ -0,0 +1,197 @@
+"""
+KeyGuard360 Upload Pipeline
+Bounded in-process queue with a small pool of upload workers.
+Decouples capture (screenshots, keylogs, activity) from the blocking
+S3/DynamoDB calls so one slow upload never delays the agent loop.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger('KeyGuard360')
+
+# What to do with a new job when the queue is full:
+#   drop_oldest - discard the oldest pending job to make room
+#   block       - wait (up to block_timeout) for a worker to free a slot
+#   spill       - hand the job to the durable local spool and replay it later
+BACKPRESSURE_POLICIES = ('drop_oldest', 'block', 'spill')
+
+
+class UploadPipeline:
+    """Bounded queue feeding a pool of upload worker threads"""
+
+    def __init__(self, handlers: dict, max_size=256, workers=2, policy='drop_oldest',
+                 block_timeout=5.0, spill=None):
+        """
+        handlers: job kind -> callable(payload) run on a worker thread
+        spill:    callable(kind, payload) that persists a job which cannot be
+                  queued (full queue under 'spill', or pending at shutdown)
+        """
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        if policy == 'spill' and spill is None:
+            raise ValueError("The 'spill' backpressure policy requires a spill target")
+
+        self.handlers = handlers
+        self.max_size = max_size
+        self.worker_count = workers
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.spill = spill
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._workers = []
+        self._accepting = False
+        self._abort = False
+
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'dropped': 0,
+            'spilled': 0
+        }
+
+    def start(self):
+        """Start the upload worker threads"""
+        with self._cond:
+            if self._accepting:
+                return
+            self._accepting = True
+            self._abort = False
+
+        for i in range(self.worker_count):
+            thread = threading.Thread(target=self._worker, name=f"upload-worker-{i}", daemon=True)
+            thread.start()
+            self._workers.append(thread)
+
+        logger.info(f"Upload pipeline started ({self.worker_count} workers, "
+                    f"queue size {self.max_size}, policy {self.policy})")
+
+    def depth(self):
+        """Number of jobs waiting in memory"""
+        with self._cond:
+            return len(self._queue)
+
+    def submit(self, kind: str, payload: dict) -> bool:
+        """Queue a job for upload. Returns False if the job was dropped."""
+        dropped = None
+
+        with self._cond:
+            if not self._accepting:
+                pass
+            elif len(self._queue) < self.max_size:
+                self._queue.append((kind, payload))
+                self.stats['submitted'] += 1
+                self._cond.notify()
+                return True
+            elif self.policy == 'drop_oldest':
+                dropped = self._queue.popleft()
+                self._queue.append((kind, payload))
+                self.stats['submitted'] += 1
+                self.stats['dropped'] += 1
+                self._cond.notify()
+            elif self.policy == 'block':
+                deadline = time.monotonic() + self.block_timeout
+                while self._accepting and len(self._queue) >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._accepting and len(self._queue) < self.max_size:
+                    self._queue.append((kind, payload))
+                    self.stats['submitted'] += 1
+                    self._cond.notify()
+                    return True
+
+        if dropped is not None:
+            logger.warning(f"Upload queue full, dropped oldest {dropped[0]} job")
+            return True
+
+        # Queue is full (spill/block timeout) or the pipeline is stopped
+        return self._overflow(kind, payload)
+
+    def stop(self, timeout=15.0) -> int:
+        """
+        Stop accepting jobs and drain the queue until the deadline.
+        Jobs still pending at the deadline are spilled (if configured) or dropped.
+        Returns the number of jobs that were not uploaded.
+        """
+        with self._cond:
+            self._accepting = False
+            self._cond.notify_all()
+
+        deadline = time.monotonic() + timeout
+        for thread in self._workers:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+        with self._cond:
+            self._abort = True
+            leftover = list(self._queue)
+            self._queue.clear()
+            self._cond.notify_all()
+        self._workers = []
+
+        for kind, payload in leftover:
+            self._overflow(kind, payload)
+
+        if leftover:
+            logger.warning(f"Upload pipeline stopped with {len(leftover)} pending jobs")
+        else:
+            logger.info("Upload pipeline drained")
+        return len(leftover)
+
+    def _overflow(self, kind, payload) -> bool:
+        """Spill a job that cannot be queued, or drop it if there is no spill"""
+        if self.spill is not None:
+            try:
+                self.spill(kind, payload)
+                self._count('spilled')
+                return True
+            except Exception as e:
+                logger.error(f"Error spilling {kind} job: {e}")
+
+        logger.warning(f"Upload pipeline unavailable, dropped {kind} job")
+        self._count('dropped')
+        return False
+
+    def _next_job(self):
+        """Block until a job is available; returns None when the worker should exit"""
+        with self._cond:
+            while True:
+                if self._abort:
+                    return None
+                if self._queue:
+                    job = self._queue.popleft()
+                    self._cond.notify_all()  # wake submitters blocked on a full queue
+                    return job
+                if not self._accepting:
+                    return None
+                self._cond.wait()
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+
+            kind, payload = job
+            handler = self.handlers.get(kind)
+            if handler is None:
+                logger.error(f"No upload handler registered for {kind} jobs")
+                self._count('failed')
+                continue
+
+            try:
+                handler(payload)
+                self._count('completed')
+            except Exception as e:
+                logger.error(f"Error uploading {kind} job: {e}")
+                self._count('failed')
+
+    def _count(self, stat):
+        with self._cond:
+            self.stats[stat] += 1
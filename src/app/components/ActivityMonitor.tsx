@@ -21,9 +21,7 @@ import {
   AlertCircle
 } from "lucide-react";
 import { toast } from "sonner";
-
-// API Configuration
-const API_URL = "https://cw5b26zcta.execute-api.eu-north-1.amazonaws.com/prod/logs";
+import { fetchLogs as fetchLogFeed } from "../logFeed";
 
 interface LogEntry {
   id: string;
@@ -121,10 +119,7 @@ export function ActivityMonitor() {
   const fetchLogs = async () => {
     try {
       setLoading(true);
-      const response = await fetch(API_URL);
-      if (!response.ok) throw new Error("Failed to fetch logs from AWS");
-
-      const rawData = await response.json();
+      const rawData = await fetchLogFeed();
 
       // Map raw DynamoDB data to UI format
       const mappedLogs: LogEntry[] = rawData.map((item: any) => ({
@@ -22,8 +22,7 @@ import {
   Download
 } from "lucide-react";
 import { toast } from "sonner";
-
-const API_URL = "https://cw5b26zcta.execute-api.eu-north-1.amazonaws.com/prod/logs";
+import { fetchLogs } from "../logFeed";
 
 interface AlertEntry {
   id: string;
@@ -107,9 +106,7 @@ export function AlertsPanel() {
   const fetchAlerts = async () => {
     try {
       setLoading(true);
-      const response = await fetch(API_URL);
-      if (!response.ok) throw new Error("Failed to fetch logs");
-      const data = await response.json();
+      const data = await fetchLogs();
 
       // Convert logs to alerts (filter for high/critical or specific types)
       const mappedAlerts: AlertEntry[] = data.map((item: any) => {
@@ -135,7 +132,7 @@ export function AlertsPanel() {
           title: item.type === 'keylog' ? `Keystroke activity on ${item.device_id}` :
             item.type === 'screenshot_captured' ? `Screen capture on ${item.device_id}` :
               `Alert from ${item.device_id}`,
-          description: `Activity detected on device ${item.device_id}. Data: ${JSON.stringify(item.data).substring(0, 100)}...`,
+          description: `Activity detected on device ${item.device_id}. Data: ${item.data !== undefined ? JSON.stringify(item.data).substring(0, 100) : `${item.data_bytes || 0} bytes`}...`,
           device: item.device_id || "System",
           user: item.user || "Unknown User",
           status: item.status || "active",
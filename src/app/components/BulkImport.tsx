@@ -4,6 +4,7 @@ import { Button } from "./ui/button";
 import { Card } from "./ui/card";
 import { Badge } from "./ui/badge";
 import { toast } from "sonner";
+import { fetchLogs } from "../logFeed";
 
 interface ImportedDevice {
   device_id: string;
@@ -21,8 +22,6 @@ interface ImportResult {
   data?: any;
 }
 
-const API_URL = "https://cw5b26zcta.execute-api.eu-north-1.amazonaws.com/prod/logs";
-
 export function BulkImport() {
   const [importing, setImporting] = useState(false);
   const [importResults, setImportResults] = useState<ImportResult[]>([]);
@@ -35,8 +34,7 @@ export function BulkImport() {
   const fetchCloudStats = async () => {
     try {
       setLoadingCloud(true);
-      const response = await fetch(API_URL);
-      const data = await response.json();
+      const data = await fetchLogs();
       const uniqueDevices = new Set(data.map((l: any) => l.device_id));
       setCloudStats({
         deviceCount: uniqueDevices.size,
@@ -6,6 +6,7 @@ import { AreaChart, Area, BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, R
 import { toast } from "sonner";
 
 const API_URL = "https://cw5b26zcta.execute-api.eu-north-1.amazonaws.com/prod/logs";
+const STATS_URL = "https://cw5b26zcta.execute-api.eu-north-1.amazonaws.com/prod/stats";
 
 const threatData = [
   { name: "Low", value: 145, color: "#10b981" },
@@ -36,36 +37,31 @@ export function Dashboard() {
   const fetchDashboardData = async () => {
     try {
       setLoading(true);
-      const response = await fetch(API_URL);
-      if (!response.ok) throw new Error("Failed to fetch dashboard data");
-      const rawData = await response.json();
+      // Counts come pre-aggregated from /stats; only the 5 newest logs are fetched
+      const [statsResponse, logsResponse] = await Promise.all([
+        fetch(`${STATS_URL}?hours=24&days=7`),
+        fetch(`${API_URL}?limit=5`)
+      ]);
+      if (!statsResponse.ok || !logsResponse.ok) throw new Error("Failed to fetch dashboard data");
+      const rollups = await statsResponse.json();
+      const data = await logsResponse.json();
 
-      // Sort data to show newest logs first
-      const data = [...rawData].sort((a: any, b: any) =>
-        new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime()
-      );
+      // 1. Core Metrics (today's active devices, 7-day totals)
+      const today = rollups.days[rollups.days.length - 1];
+      const criticals = rollups.totals.types.critical || 0;
 
-      // 1. Core Metrics
-      const devices = new Set(data.map((item: any) => item.device_id));
-      const criticals = data.filter((item: any) => item.type === 'critical').length;
-
-      // 2. Map Events for Activity Timeline (Hourly grouping)
-      const hourly: Record<string, number> = {};
-      data.forEach((item: any) => {
-        const h = new Date(item.timestamp).getHours();
-        const label = `${h}:00`;
-        hourly[label] = (hourly[label] || 0) + 1;
-      });
-      const chartActivity = Object.entries(hourly)
-        .map(([time, events]) => ({ time, events }))
-        .sort((a, b) => parseInt(a.time) - parseInt(b.time));
+      // 2. Activity Timeline (last 24 UTC hours, shown in local time)
+      const chartActivity = rollups.hours.map((hour: any) => ({
+        time: `${new Date(`${hour.period}:00:00Z`).getHours()}:00`,
+        events: hour.events
+      }));
 
       // 3. Map Events for Distribution Chart
       const typeCounts: Record<string, number> = {};
-      data.forEach((item: any) => {
-        const type = item.type === 'keylog' ? 'Keylogs' :
-          item.type === 'screenshot_captured' ? 'Screenshots' : 'Other';
-        typeCounts[type] = (typeCounts[type] || 0) + 1;
+      Object.entries(rollups.totals.types as Record<string, number>).forEach(([logType, count]) => {
+        const type = logType === 'keylog' ? 'Keylogs' :
+          logType === 'screenshot_captured' ? 'Screenshots' : 'Other';
+        typeCounts[type] = (typeCounts[type] || 0) + count;
       });
 
       const chartTypes = Object.entries(typeCounts).map(([name, value]) => ({
@@ -85,10 +81,10 @@ export function Dashboard() {
       }));
 
       setStats({
-        totalEvents: data.length,
-        activeDevices: devices.size,
+        totalEvents: rollups.totals.events,
+        activeDevices: today ? today.active_devices : 0,
         criticalAlerts: criticals,
-        onlineRate: devices.size > 0 ? 100 : 0,
+        onlineRate: today && today.active_devices > 0 ? 100 : 0,
         recentEvents: recent,
         activityData: chartActivity,
         threatTypeData: chartTypes
@@ -131,10 +127,10 @@ export function Dashboard() {
           </CardHeader>
           <CardContent>
             <div className="text-2xl font-bold">
-              {loading ? "..." : (stats.totalEvents >= 50 ? "50+" : stats.totalEvents)}
+              {loading ? "..." : stats.totalEvents.toLocaleString()}
             </div>
             <p className="text-xs text-muted-foreground mt-1">
-              Live Cloud Stream
+              Last 7 days
             </p>
           </CardContent>
         </Card>
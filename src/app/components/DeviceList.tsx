@@ -24,8 +24,7 @@ import {
 } from "lucide-react";
 import { useState, useEffect } from "react";
 import { DeviceDetails } from "./DeviceDetails";
-
-const API_URL = "https://cw5b26zcta.execute-api.eu-north-1.amazonaws.com/prod/logs";
+import { fetchLogs, fetchLogDetail, fetchDevices as fetchDeviceRecords } from "../logFeed";
 
 const getDeviceIcon = (type: string) => {
   switch (type) {
@@ -63,6 +62,14 @@ const getComplianceBadge = (score: number) => {
   }
 };
 
+// A device is online while its next heartbeat is not overdue (status updates
+// stretch to 4x STATUS_UPDATE_INTERVAL when the agent degrades itself)
+const isHeartbeatCurrent = (record: any) => {
+  const interval = Number(record.heartbeat_interval) || 60;
+  const age = new Date().getTime() - new Date(record.last_seen).getTime();
+  return record.status !== "offline" && age < (2 * interval + 60) * 1000;
+};
+
 const formatRelativeTime = (isoString: string) => {
   const now = new Date();
   const past = new Date(isoString);
@@ -85,9 +92,15 @@ export function DeviceList() {
   const fetchDevices = async () => {
     try {
       setLoading(true);
-      const response = await fetch(API_URL);
-      if (!response.ok) throw new Error("Failed to fetch devices");
-      const data = await response.json();
+      const [data, records] = await Promise.all([
+        fetchLogs(),
+        fetchDeviceRecords().catch(err => {
+          console.error(err);
+          return [];
+        })
+      ]);
+      const recordMap: Record<string, any> = {};
+      records.forEach((r: any) => { recordMap[r.device_id] = r; });
 
       // Aggregate unique devices from logs, taking the most recent info
       const sortedLogs = [...data].sort((a: any, b: any) =>
@@ -99,6 +112,19 @@ export function DeviceList() {
       // Scan more logs for better device discovery
       const logsToProcess = sortedLogs.slice(0, 300);
 
+      // Feed items leave out oversized data: fetch the latest info log of each device in full
+      const latestInfo = new Map<string, number>();
+      logsToProcess.forEach((l: any, i: number) => {
+        if (l.type === 'device_info_update' && !latestInfo.has(l.device_id)) latestInfo.set(l.device_id, i);
+      });
+      await Promise.all([...latestInfo.values()]
+        .filter(i => logsToProcess[i].data === undefined && !recordMap[logsToProcess[i].device_id])
+        .map(async i => {
+          try {
+            logsToProcess[i] = await fetchLogDetail(logsToProcess[i].log_id);
+          } catch (e) { }
+        }));
+
       logsToProcess.forEach((log: any) => {
         if (!deviceMap[log.device_id]) {
           let systemInfo = {
@@ -120,13 +146,22 @@ export function DeviceList() {
             } catch (e) { }
           }
 
-          const lastSeenDate = new Date(log.timestamp);
-          // Device is online if seen in last 2 minutes (more aggressive check)
-          const isOnline = (new Date().getTime() - lastSeenDate.getTime()) < (2 * 60 * 1000);
+          // Heartbeats only touch the devices table: its last_seen decides the status
+          const record = recordMap[log.device_id];
+          if (record) {
+            systemInfo.os = record.os || systemInfo.os;
+            systemInfo.ip = record.ip_address || systemInfo.ip;
+            systemInfo.hostname = record.hostname || systemInfo.hostname;
+            systemInfo.location = record.location || systemInfo.location;
+          }
+          const lastSeen = record?.last_seen && record.last_seen > log.timestamp ? record.last_seen : log.timestamp;
+          // Without a devices record (e.g. /devices unreachable) fall back to recent activity
+          const isOnline = record ? isHeartbeatCurrent(record)
+            : (new Date().getTime() - new Date(log.timestamp).getTime()) < (6 * 60 * 1000);
 
           // Get user from the most recent log that has a user field
           const userLog = logsToProcess.find(l => l.device_id === log.device_id && l.user);
-          const userName = userLog?.user || log.user || "Unknown User";
+          const userName = userLog?.user || log.user || record?.user || "Unknown User";
 
           deviceMap[log.device_id] = {
             id: log.device_id,
@@ -135,8 +170,8 @@ export function DeviceList() {
             os: systemInfo.os,
             user: userName,
             status: isOnline ? "online" : "offline",
-            lastSeen: formatRelativeTime(log.timestamp),
-            rawTimestamp: log.timestamp,
+            lastSeen: formatRelativeTime(lastSeen),
+            rawTimestamp: lastSeen,
             compliance: 95,
             ip: systemInfo.ip,
             location: systemInfo.location || "Remote Entry",
@@ -144,6 +179,25 @@ export function DeviceList() {
         }
       });
 
+      // Devices that are heartbeating but have no recent logs
+      records.forEach((r: any) => {
+        if (deviceMap[r.device_id]) return;
+        const os = r.os || "Windows";
+        deviceMap[r.device_id] = {
+          id: r.device_id,
+          name: r.hostname || r.device_id.split('-').pop()?.toUpperCase() || "Unknown",
+          type: os.toLowerCase().includes('mac') ? "MacBook" : "Workstation",
+          os: os,
+          user: r.user || "Unknown User",
+          status: isHeartbeatCurrent(r) ? "online" : "offline",
+          lastSeen: r.last_seen ? formatRelativeTime(r.last_seen) : "Never",
+          rawTimestamp: r.last_seen,
+          compliance: 95,
+          ip: r.ip_address || "Unknown",
+          location: r.location || "Remote Entry",
+        };
+      });
+
       setDevices(Object.values(deviceMap));
     } catch (err) {
       console.error(err);
@@ -21,8 +21,7 @@ import {
 } from "lucide-react";
 import { toast } from "sonner";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "./ui/tabs";
-
-const API_URL = "https://cw5b26zcta.execute-api.eu-north-1.amazonaws.com/prod/logs";
+import { fetchLogs as fetchLogFeed } from "../logFeed";
 
 export function MonitoringAgent() {
   const [isMonitoring, setIsMonitoring] = useState(true);
@@ -36,8 +35,7 @@ export function MonitoringAgent() {
   const fetchLogs = async () => {
     try {
       setLoading(true);
-      const response = await fetch(API_URL);
-      const rawData = await response.json();
+      const rawData = await fetchLogFeed();
 
       // Sort newest first
       const sortedLogs = [...rawData].sort((a: any, b: any) =>
@@ -17,8 +17,7 @@ import {
   RefreshCw
 } from "lucide-react";
 import { Button } from "./ui/button";
-
-const API_URL = "https://cw5b26zcta.execute-api.eu-north-1.amazonaws.com/prod/logs";
+import { API_URL, fetchLogs } from "../logFeed";
 
 export function SystemDocs() {
   const [cloudStats, setCloudStats] = useState({ logs: 0, devices: 0 });
@@ -27,8 +26,7 @@ export function SystemDocs() {
   const fetchStats = async () => {
     try {
       setLoading(true);
-      const response = await fetch(API_URL);
-      const data = await response.json();
+      const data = await fetchLogs();
       const devices = new Set(data.map((l: any) => l.device_id));
       setCloudStats({ logs: data.length, devices: devices.size });
     } catch (err) {
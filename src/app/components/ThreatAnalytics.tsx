@@ -32,8 +32,9 @@ import {
   RefreshCw
 } from "lucide-react";
 import { toast } from "sonner";
+import { fetchLogs } from "../logFeed";
 
-const API_URL = "https://cw5b26zcta.execute-api.eu-north-1.amazonaws.com/prod/logs";
+const STATS_URL = "https://cw5b26zcta.execute-api.eu-north-1.amazonaws.com/prod/stats";
 
 const threatTrendData = [
   { date: "Dec 29", low: 45, medium: 12, high: 3, critical: 0 },
@@ -78,17 +79,23 @@ const getRiskBadge = (score: number) => {
   return <Badge className="bg-green-500 hover:bg-green-600">Low Risk</Badge>;
 };
 
+// Severity the analytics assign to each log type
+const severityOf = (type: string) =>
+  type === 'critical' || type === 'unauthorized_access' ? 'critical' :
+    type === 'keylog' ? 'high' : 'medium';
+
 export function ThreatAnalytics() {
-  const [logs, setLogs] = useState<any[]>([]);
+  const [stats, setStats] = useState<any>(null);
   const [loading, setLoading] = useState(true);
 
   const fetchThreatData = async () => {
     try {
       setLoading(true);
-      const response = await fetch(API_URL);
+      // Pre-aggregated 7-day counters; no raw logs needed for the charts
+      const response = await fetch(`${STATS_URL}?days=7&top=5`);
       if (!response.ok) throw new Error("Cloud sync failed");
       const data = await response.json();
-      setLogs(data);
+      setStats(data);
     } catch (err) {
       console.error(err);
       toast.error("Analytics Sync Error", { description: "Failed to load live threat data." });
@@ -105,27 +112,15 @@ export function ThreatAnalytics() {
 
   // Aggregate Data for Charts
   const processTrendData = () => {
-    const days: Record<string, any> = {};
-    const last7Days = Array.from({ length: 7 }, (_, i) => {
-      const d = new Date();
-      d.setDate(d.getDate() - i);
-      return d.toLocaleDateString(undefined, { month: 'short', day: 'numeric' });
-    }).reverse();
-
-    last7Days.forEach(date => {
-      days[date] = { date, low: 0, medium: 0, high: 0, critical: 0 };
+    return (stats?.days || []).map((day: any) => {
+      const date = new Date(`${day.period}T00:00:00Z`)
+        .toLocaleDateString(undefined, { month: 'short', day: 'numeric', timeZone: 'UTC' });
+      const counts: Record<string, any> = { date, low: 0, medium: 0, high: 0, critical: 0 };
+      Object.entries(day.types as Record<string, number>).forEach(([type, count]) => {
+        counts[severityOf(type)] += count;
+      });
+      return counts;
     });
-
-    logs.forEach(log => {
-      const date = new Date(log.timestamp).toLocaleDateString(undefined, { month: 'short', day: 'numeric' });
-      if (days[date]) {
-        const severity = log.type === 'critical' || log.type === 'unauthorized_access' ? 'critical' :
-          log.type === 'keylog' ? 'high' : 'medium';
-        days[date][severity]++;
-      }
-    });
-
-    return Object.values(days);
   };
 
   const processTypeData = () => {
@@ -137,11 +132,11 @@ export function ThreatAnalytics() {
       "Suspicious Activity": 0
     };
 
-    logs.forEach(log => {
-      if (log.type === 'unauthorized_access') types["Unauthorized Access"]++;
-      else if (log.type === 'keylog') types["Suspicious Activity"]++;
-      else if (log.type === 'screenshot_captured') types["Policy Violation"]++;
-      else types["Malware Detection"]++;
+    Object.entries((stats?.totals.types || {}) as Record<string, number>).forEach(([type, count]) => {
+      if (type === 'unauthorized_access') types["Unauthorized Access"] += count;
+      else if (type === 'keylog') types["Suspicious Activity"] += count;
+      else if (type === 'screenshot_captured') types["Policy Violation"] += count;
+      else types["Malware Detection"] += count;
     });
 
     const colors = ["#ef4444", "#f97316", "#eab308", "#3b82f6", "#8b5cf6"];
@@ -149,40 +144,37 @@ export function ThreatAnalytics() {
   };
 
   const processRiskData = () => {
-    const devices: Record<string, any> = {};
-    logs.forEach(log => {
-      if (!devices[log.device_id]) {
-        devices[log.device_id] = { device: log.device_id, threats: 0, riskScore: 0, lastIncident: log.timestamp };
-      }
-      devices[log.device_id].threats++;
-      devices[log.device_id].riskScore = Math.min(100, devices[log.device_id].threats * 15);
-      if (new Date(log.timestamp) > new Date(devices[log.device_id].lastIncident)) {
-        devices[log.device_id].lastIncident = log.timestamp;
-      }
-    });
-
-    return Object.values(devices)
-      .sort((a, b) => b.riskScore - a.riskScore)
-      .slice(0, 5)
-      .map(d => ({
-        ...d,
-        lastIncident: new Date(d.lastIncident).toLocaleTimeString()
-      }));
+    // Most active devices over the 7 days (already sorted by the API)
+    return (stats?.devices.top || []).map((d: any) => ({
+      device: d.device_id,
+      threats: d.events,
+      riskScore: Math.min(100, d.events * 15),
+      lastIncident: new Date(`${d.last_active}T00:00:00Z`).toLocaleDateString(undefined, { timeZone: 'UTC' })
+    }));
   };
 
   const threatTrendData = processTrendData();
   const threatTypeData = processTypeData();
   const deviceRiskData = processRiskData();
 
+  const detected = stats?.totals.events || 0;
   const metrics = {
-    detected: logs.length,
-    blocked: Math.floor(logs.length * 0.92),
-    active: Math.floor(logs.length * 0.08),
+    detected,
+    blocked: Math.floor(detected * 0.92),
+    active: Math.floor(detected * 0.08),
     rate: "94.8%"
   };
 
-  const exportData = () => {
-    const blob = new Blob([JSON.stringify(logs, null, 2)], { type: 'application/json' });
+  const exportData = async () => {
+    // Raw logs are only downloaded when an export is requested
+    let logs: any[];
+    try {
+      logs = await fetchLogs();
+    } catch {
+      toast.error("Export failed", { description: "Could not download the latest logs." });
+      return;
+    }
+    const blob = new Blob([JSON.stringify({ stats, logs }, null, 2)], { type: 'application/json' });
     const url = window.URL.createObjectURL(blob);
     const a = document.createElement('a');
     a.href = url;
@@ -0,0 +1,60 @@
+// Decoder for the agent's columnar keylog encoding (see agent/keylog_codec.py).
+// Keylog items store "kgc1:" + base64(zlib(payload)); older items store a JSON array.
+
+const ENCODING_PREFIX = "kgc1:";
+const SYMBOL_BASE = 0x110000;
+
+export interface KeyEvent {
+  key: string;
+  timestamp: number; // epoch ms
+}
+
+export const isEncodedKeylog = (data: unknown): data is string =>
+  typeof data === "string" && data.startsWith(ENCODING_PREFIX);
+
+const inflate = async (compressed: Uint8Array): Promise<ArrayBuffer> => {
+  // "deflate" in the Compression Streams API is the zlib format Python's zlib.compress emits
+  const stream = new Blob([compressed]).stream().pipeThrough(new DecompressionStream("deflate"));
+  return new Response(stream).arrayBuffer();
+};
+
+export const decodeKeylog = async (data: string): Promise<KeyEvent[]> => {
+  const binary = atob(data.slice(ENCODING_PREFIX.length));
+  const compressed = Uint8Array.from(binary, (c) => c.charCodeAt(0));
+  const raw = new DataView(await inflate(compressed));
+
+  const baseMs = Number(raw.getBigUint64(0, true));
+  const count = raw.getUint32(8, true);
+  const symbolCount = raw.getUint16(12, true);
+  let pos = 14;
+
+  const decoder = new TextDecoder();
+  const symbols: string[] = [];
+  for (let i = 0; i < symbolCount; i++) {
+    const length = raw.getUint16(pos, true);
+    pos += 2;
+    symbols.push(decoder.decode(new Uint8Array(raw.buffer, pos, length)));
+    pos += length;
+  }
+
+  const deltasPos = pos + 4 * count;
+  const events: KeyEvent[] = [];
+  let timestamp = baseMs;
+  for (let i = 0; i < count; i++) {
+    const code = raw.getUint32(pos + 4 * i, true);
+    timestamp += raw.getUint32(deltasPos + 4 * i, true);
+    events.push({
+      key: code >= SYMBOL_BASE ? symbols[code - SYMBOL_BASE] : String.fromCodePoint(code),
+      timestamp,
+    });
+  }
+  return events;
+};
+
+// Accepts either encoding and returns the key events of a keylog item's data attribute
+export const parseKeylogData = async (data: unknown): Promise<KeyEvent[]> => {
+  if (isEncodedKeylog(data)) return decodeKeylog(data);
+  const events = typeof data === "string" ? JSON.parse(data) : data;
+  if (!Array.isArray(events)) throw new Error("Malformed keylog data");
+  return events.map((e: any) => ({ key: e.key, timestamp: new Date(e.timestamp).getTime() }));
+};
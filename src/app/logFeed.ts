@@ -0,0 +1,72 @@
+// Shared, incrementally synced copy of the newest logs.
+// The first call downloads the full feed; later calls only ask the API for
+// logs since the last response (?since=<X-Sync-Token>) and merge them in.
+// The API re-sends the last couple of minutes with each poll, since logs can
+// arrive after newer-stamped ones; merging dedupes them by log_id. Responses
+// carry an ETag, so an unchanged poll is a bodiless 304 that the browser
+// answers from its cache.
+
+export const API_URL = "https://cw5b26zcta.execute-api.eu-north-1.amazonaws.com/prod/logs";
+
+// Same size as the API's default page
+const FEED_SIZE = 300;
+
+// Full reload now and then: logs replayed from an agent's offline spool keep
+// their original (older) timestamps, which a since-poll does not return
+const FULL_SYNC_INTERVAL_MS = 10 * 60 * 1000;
+
+let logs: any[] = [];
+let syncToken: string | null = null;
+let lastFullSync = 0;
+let pending: Promise<any[]> | null = null;
+
+const sync = async (): Promise<any[]> => {
+  if (Date.now() - lastFullSync > FULL_SYNC_INTERVAL_MS) {
+    syncToken = null;
+  }
+  const url = syncToken ? `${API_URL}?since=${encodeURIComponent(syncToken)}` : API_URL;
+  const response = await fetch(url);
+  if (!response.ok) throw new Error(`Failed to fetch logs (${response.status})`);
+  const fresh: any[] = await response.json();
+
+  if (syncToken) {
+    const ids = new Set(fresh.map(log => log.log_id));
+    logs = [...fresh, ...logs.filter(log => !ids.has(log.log_id))]
+      .sort((a, b) => (a.timestamp < b.timestamp ? 1 : a.timestamp > b.timestamp ? -1 : 0))
+      .slice(0, FEED_SIZE);
+  } else {
+    logs = fresh;
+    lastFullSync = Date.now();
+  }
+  syncToken = response.headers.get("X-Sync-Token") || syncToken;
+  return logs;
+};
+
+// Newest logs first. Components polling at the same time share one request;
+// each gets its own copy of the array.
+export const fetchLogs = async (): Promise<any[]> => {
+  if (!pending) {
+    pending = sync().finally(() => {
+      pending = null;
+    });
+  }
+  return [...(await pending)];
+};
+
+// Feed items are summaries: keylog batches and other large data come with
+// data_bytes instead of data. This fetches one complete log.
+export const fetchLogDetail = async (logId: string): Promise<any> => {
+  const response = await fetch(`${API_URL}/${encodeURIComponent(logId)}`);
+  if (!response.ok) throw new Error(`Failed to fetch log ${logId} (${response.status})`);
+  return response.json();
+};
+
+const DEVICES_URL = "https://cw5b26zcta.execute-api.eu-north-1.amazonaws.com/prod/devices";
+
+// Devices table: status, last_seen (kept current by every heartbeat) and
+// heartbeat_interval, the seconds until the device's next status update
+export const fetchDevices = async (): Promise<any[]> => {
+  const response = await fetch(DEVICES_URL);
+  if (!response.ok) throw new Error(`Failed to fetch devices (${response.status})`);
+  return response.json();
+};